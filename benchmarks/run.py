@@ -0,0 +1,419 @@
+"""
+Times the merge and coverage pipeline stages on synthetic fonts and compares the
+results against a stored baseline.
+
+    python -m benchmarks.run                    # compare against benchmarks/baseline.json
+    python -m benchmarks.run --update-baseline  # record the current numbers as the baseline
+    python -m benchmarks.run --checks-only      # run only the checks below, as CI does
+
+The startup stages run the CLI in a fresh interpreter and are timed only; they also fail
+the run if `--version` or `coverage` imports ufoLib2 or ufo2ft, or `--version` imports
+fontTools. The run also fails if `compile_ufo_fast` builds a different font with worker
+processes than without, or if the direct and low-memory merges keep a different glyph set
+than the UFO path with `keep_non_bmp`.
+"""
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from fontTools.ttLib import TTFont
+from ufo2ft import compileTTF
+
+from impl import merge_fonts, coverage_analysis
+from impl.merge import (
+    codepoint_ranges_to_remove,
+    remove_glyphs_in_ranges,
+    clean_non_bmp_glyphs,
+    merge_ufo_fonts,
+)
+from impl.batch import merge_batch
+from impl.compiler import compile_ufo_fast
+from impl.utils import convert_ttfont_to_ufo
+
+from .synthetic import make_synthetic_font
+
+BASELINE_PATH = Path(__file__).with_name('baseline.json')
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# Only the UFO merge path needs these; startup commands that load them are regressions whatever their timing
+UFO_MODULES = ('ufoLib2', 'ufo2ft')
+# Printing the version reads no font, so it must not load fontTools either
+STARTUP_FORBIDDEN_MODULES = {
+    'startup --version': UFO_MODULES + ('fontTools',),
+    'startup coverage': UFO_MODULES,
+}
+
+# Runs a command in-process and reports which of the given modules it imported
+IMPORT_CHECK = """
+import json, sys
+import main
+try:
+    main.run(json.loads(sys.argv[1]))
+except SystemExit:
+    pass
+print(json.dumps([name for name in json.loads(sys.argv[2]) if name in sys.modules]))
+"""
+
+# Differences below these are measurement noise, whatever the relative change
+MIN_SECONDS_DELTA = 0.05
+MIN_PEAK_MB_DELTA = 1.0
+
+# Base font plus two fallbacks; the codepoint spreads overlap so merging has collisions to resolve
+FONT_SPECS = [
+    dict(glyph_count=1500, composite_ratio=0.2, codepoint_start=0x0020, codepoint_spread=0x2000, non_bmp_share=0.0, seed=1),
+    dict(glyph_count=3000, composite_ratio=0.3, codepoint_start=0x0020, codepoint_spread=0x6000, non_bmp_share=0.05, seed=2),
+    dict(glyph_count=3000, composite_ratio=0.1, codepoint_start=0x4E00, codepoint_spread=0x5000, non_bmp_share=0.2, seed=3),
+]
+
+# Worker processes of the parallel compile stage and check
+COMPILE_JOBS = 2
+
+# A Latin and a CJK block, as an application shipping a fixed set of strings would request
+SUBSET_RANGES = [(0x0020, 0x007E), (0x4E00, 0x4FFF)]
+
+
+def scaled_specs(scale: float) -> list[dict]:
+    return [dict(spec, glyph_count=max(16, int(spec['glyph_count'] * scale))) for spec in FONT_SPECS]
+
+
+def generate_fonts(work_dir: str, specs: list[dict]) -> list[str]:
+    font_paths = []
+    for index, spec in enumerate(specs):
+        font_path = os.path.join(work_dir, f"synthetic{index}.ttf")
+        make_synthetic_font(font_path, family_name=f"Synthetic {index}", **spec)
+        font_paths.append(font_path)
+    return font_paths
+
+
+def run_pipeline(font_paths: list[str], work_dir: str, measure):
+    """
+    Runs every benchmarked stage once, passing each to `measure(stage, func, *args, **kwargs)`.
+
+    Every stage gets freshly prepared inputs, so the pipeline can be run repeatedly.
+    """
+    tt_fonts = [TTFont(font_path) for font_path in font_paths]
+    ufo_fonts = [measure('convert_ttfont_to_ufo', convert_ttfont_to_ufo, tt_font) for tt_font in tt_fonts]
+    for ufo_font in ufo_fonts:
+        measure('remove_glyphs_in_ranges', remove_glyphs_in_ranges, ufo_font, codepoint_ranges_to_remove)
+        measure('clean_non_bmp_glyphs', clean_non_bmp_glyphs, ufo_font)
+    for ufo_font in ufo_fonts[1:]:
+        measure('merge_ufo_fonts', merge_ufo_fonts, ufo_fonts[0], ufo_font)
+    measure('compileTTF', compileTTF, ufo_fonts[0])
+    measure('compile_ufo_fast', compile_ufo_fast, ufo_fonts[0])
+    measure(f'compile_ufo_fast -j {COMPILE_JOBS}', compile_ufo_fast, ufo_fonts[0], jobs=COMPILE_JOBS)
+
+    output = os.path.join(work_dir, 'merged.ttf')
+    measure('merge_fonts', merge_fonts, font_paths, output)
+    measure('merge_fonts --fast-compile', merge_fonts, font_paths, output, fast_compile=True)
+    measure('merge_fonts --direct', merge_fonts, font_paths, output, direct=True)
+    measure('merge_fonts --low-memory', merge_fonts, font_paths, output, low_memory=True)
+    measure('merge_fonts --unicodes', merge_fonts, font_paths, output, subset_ranges=SUBSET_RANGES)
+    for font_path in font_paths:
+        measure('coverage_analysis', coverage_analysis, font_path, os.path.join(work_dir, 'coverage.txt'))
+        measure('coverage_analysis --fast', coverage_analysis, font_path, os.path.join(work_dir, 'coverage.txt'), True)
+
+
+def startup_commands(font_path: str, work_dir: str) -> dict[str, list[str]]:
+    """Returns the command lines whose startup cost is guarded, by stage name."""
+    return {
+        'startup --version': ['--version'],
+        'startup coverage': ['coverage', font_path, '-o', os.path.join(work_dir, 'coverage.txt')],
+    }
+
+
+def time_startup(commands: dict[str, list[str]], repeat: int) -> dict[str, float]:
+    """
+    Returns the best wall time of every command over `repeat` runs, each in a fresh
+    interpreter, so interpreter startup and imports are included.
+    """
+    best = {}
+    for _ in range(repeat):
+        for stage, args in commands.items():
+            start = time.perf_counter()
+            subprocess.run([sys.executable, str(REPO_ROOT / 'main.py'), *args], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+            elapsed = time.perf_counter() - start
+            best[stage] = min(best.get(stage, elapsed), elapsed)
+    return best
+
+
+def check_startup_imports(commands: dict[str, list[str]]) -> list[str]:
+    """Returns a message for every command that imports one of its `STARTUP_FORBIDDEN_MODULES`."""
+    messages = []
+    for stage, args in commands.items():
+        result = subprocess.run(
+            [sys.executable, '-c', IMPORT_CHECK, json.dumps(args), json.dumps(STARTUP_FORBIDDEN_MODULES[stage])],
+            cwd=REPO_ROOT, capture_output=True, text=True, check=True,
+        )
+        imported = json.loads(result.stdout.strip().splitlines()[-1])
+        if imported:
+            messages.append(f"{stage}: imports {', '.join(imported)}, which it does not need")
+    return messages
+
+
+def compiled_font_bytes(ufo_font, jobs: int) -> bytes:
+    tt_font = compile_ufo_fast(ufo_font, jobs=jobs)
+    # Saving stamps the current time; give both builds the same one
+    tt_font.recalcTimestamp = False
+    tt_font['head'].created = tt_font['head'].modified = 0
+    stream = io.BytesIO()
+    tt_font.save(stream)
+    return stream.getvalue()
+
+
+def merged_ufo_font(font_paths: list[str]):
+    ufo_fonts = [convert_ttfont_to_ufo(TTFont(font_path)) for font_path in font_paths]
+    for ufo_font in ufo_fonts[1:]:
+        merge_ufo_fonts(ufo_fonts[0], ufo_font)
+    return ufo_fonts[0]
+
+
+@contextlib.contextmanager
+def fixed_timestamps():
+    """Makes every font saved in the block carry the same creation and modification time."""
+    previous = os.environ.get('SOURCE_DATE_EPOCH')
+    os.environ['SOURCE_DATE_EPOCH'] = '0'
+    try:
+        yield
+    finally:
+        if previous is None:
+            del os.environ['SOURCE_DATE_EPOCH']
+        else:
+            os.environ['SOURCE_DATE_EPOCH'] = previous
+
+
+def check_parallel_compile(font_paths: list[str], work_dir: str) -> list[str]:
+    """
+    Returns a message for every build of the merged synthetic fonts with worker processes
+    that differs in any byte from the single-job build: `compile_ufo_fast` on glyphs whose
+    outlines are still pending and on glyphs already drawn, and the files written by
+    `merge_fonts --fast-compile` and by a batch merge of the same fonts. The single-job
+    `--fast-compile` file must also match the `compileTTF` build, with non-BMP codepoints kept
+    so that the cmap needs its format 12 subtables.
+    """
+    messages = []
+    for drawn in (False, True):
+        ufo_font = merged_ufo_font(font_paths)
+        if drawn:
+            for glyph in ufo_font:
+                glyph.contours  # As after --dedupe-outlines or a UFO export
+        # The single job draws pending outlines in place, so it goes second
+        parallel = compiled_font_bytes(ufo_font, COMPILE_JOBS)
+        serial = compiled_font_bytes(ufo_font, 1)
+        if parallel != serial:
+            state = 'drawn' if drawn else 'pending'
+            messages.append(f"compile_ufo_fast -j {COMPILE_JOBS} on {state} outlines: output differs from a single job "
+                            f"({len(parallel)} vs {len(serial)} bytes)")
+
+    ufo2ft_output = os.path.join(work_dir, 'ufo2ft.ttf')
+    serial_output = os.path.join(work_dir, 'serial.ttf')
+    parallel_output = os.path.join(work_dir, 'parallel.ttf')
+    batch_output = os.path.join(work_dir, 'batch.ttf')
+    with fixed_timestamps():
+        merge_fonts(font_paths, ufo2ft_output, keep_non_bmp=True)
+        merge_fonts(font_paths, serial_output, keep_non_bmp=True, fast_compile=True)
+        merge_fonts(font_paths, parallel_output, keep_non_bmp=True, fast_compile=True, jobs=COMPILE_JOBS)
+        # A single target, so every job goes to its compile
+        merge_batch([(font_paths[0], batch_output)], font_paths[1:], jobs=COMPILE_JOBS, keep_non_bmp=True, fast_compile=True)
+    serial = Path(serial_output).read_bytes()
+    expected = Path(ufo2ft_output).read_bytes()
+    if serial != expected:
+        messages.append(f"merge_fonts --fast-compile --keep-non-bmp: output differs from compileTTF ({len(serial)} vs {len(expected)} bytes)")
+    for command, output in ((f'merge_fonts --fast-compile -j {COMPILE_JOBS}', parallel_output),
+                            (f'merge_batch --fast-compile -j {COMPILE_JOBS}', batch_output)):
+        parallel = Path(output).read_bytes()
+        if parallel != serial:
+            messages.append(f"{command}: output differs from a single job ({len(parallel)} vs {len(serial)} bytes)")
+    return messages
+
+
+def check_keep_non_bmp(font_paths: list[str], work_dir: str) -> list[str]:
+    """
+    Returns a message for every direct merge of the synthetic fonts with `keep_non_bmp` that
+    drops a glyph the UFO path keeps, or adds one that no codepoint and no composite uses.
+
+    The direct engine also keeps components the UFO path's range filter deletes from under
+    their composites, so only those extras are allowed.
+    """
+    output = os.path.join(work_dir, 'keep-non-bmp.ttf')
+    merge_fonts(font_paths, output, keep_non_bmp=True)
+    expected = set(TTFont(output).getGlyphOrder())
+    messages = []
+    for option in ('direct', 'low_memory'):
+        merge_fonts(font_paths, output, keep_non_bmp=True, **{option: True})
+        tt_font = TTFont(output)
+        glyph_order = tt_font.getGlyphOrder()
+        used = set(tt_font.getBestCmap().values())
+        glyf_table = tt_font['glyf']
+        for glyph_name in glyph_order:
+            used.update(glyf_table[glyph_name].getComponentNames(glyf_table))
+        missing = expected.difference(glyph_order)
+        extra = [glyph_name for glyph_name in glyph_order if glyph_name not in expected and glyph_name not in used]
+        if missing or extra:
+            messages.append(f"merge_fonts --{option.replace('_', '-')} --keep-non-bmp: {len(missing)} glyphs missing and "
+                            f"{len(extra)} unused glyphs added compared to the UFO path")
+    return messages
+
+
+def time_stages(font_paths: list[str], work_dir: str, repeat: int) -> dict[str, float]:
+    """Returns the best total wall time of each stage over `repeat` pipeline runs."""
+    best = {}
+    for _ in range(repeat):
+        totals = {}
+
+        def measure(stage, func, *args, **kwargs):
+            gc.collect()
+            start = time.perf_counter()
+            result = func(*args, **kwargs)
+            totals[stage] = totals.get(stage, 0.0) + time.perf_counter() - start
+            return result
+
+        run_pipeline(font_paths, work_dir, measure)
+        for stage, seconds in totals.items():
+            best[stage] = min(best.get(stage, seconds), seconds)
+    return best
+
+
+def trace_stages(font_paths: list[str], work_dir: str) -> dict[str, float]:
+    """Returns the largest peak of traced Python allocations, in MiB, across each stage's calls."""
+    peaks = {}
+
+    def measure(stage, func, *args, **kwargs):
+        gc.collect()
+        tracemalloc.start()
+        try:
+            result = func(*args, **kwargs)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        peaks[stage] = max(peaks.get(stage, 0.0), peak / (1 << 20))
+        return result
+
+    run_pipeline(font_paths, work_dir, measure)
+    return peaks
+
+
+def compare(results: dict, baseline: dict, time_tolerance: float, memory_tolerance: float) -> list[str]:
+    """Returns a message for every stage that got slower or hungrier than the baseline allows."""
+    regressions = []
+    for stage, current in results['stages'].items():
+        reference = baseline['stages'].get(stage)
+        if reference is None:
+            continue
+        for key, tolerance, min_delta, unit in (
+            ('seconds', time_tolerance, MIN_SECONDS_DELTA, 's'),
+            ('peak_mb', memory_tolerance, MIN_PEAK_MB_DELTA, ' MiB'),
+        ):
+            limit = max(reference[key] * (1 + tolerance), reference[key] + min_delta)
+            if current[key] > limit:
+                regressions.append(
+                    f"{stage}: {key} {current[key]:.3f}{unit} exceeds baseline {reference[key]:.3f}{unit} "
+                    f"by more than {tolerance:.0%}"
+                )
+    return regressions
+
+
+def print_results(results: dict, baseline: dict = None):
+    print(f"{'Stage':<28}{'Seconds':>10}{'Baseline':>10}{'Peak MiB':>10}{'Baseline':>10}")
+    for stage, current in results['stages'].items():
+        reference = (baseline or {}).get('stages', {}).get(stage, {})
+        print(f"{stage:<28}{current['seconds']:>10.3f}{reference.get('seconds', float('nan')):>10.3f}"
+              f"{current['peak_mb']:>10.1f}{reference.get('peak_mb', float('nan')):>10.1f}")
+
+
+def report_failures(failures: list[tuple[str, list[str]]]):
+    """Prints the messages of every failed check and exits with status 1, if any check failed."""
+    if not any(messages for _, messages in failures):
+        return
+    for title, messages in failures:
+        if messages:
+            print(f"\n{title}:", file=sys.stderr)
+            for message in messages:
+                print(f"  {message}", file=sys.stderr)
+    sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark font-mate's merge and coverage stages on synthetic fonts.")
+    parser.add_argument('--scale', type=float, default=1.0, help="Multiplier applied to the glyph count of every synthetic font")
+    parser.add_argument('--repeat', type=int, default=3, help="Number of timed runs; the fastest one is reported")
+    parser.add_argument('--baseline', default=str(BASELINE_PATH), help="Baseline JSON to compare against or update")
+    parser.add_argument('--update-baseline', action='store_true', help="Write the current results to the baseline file instead of comparing")
+    parser.add_argument('--time-tolerance', type=float, default=0.3, help="Allowed slowdown per stage as a fraction (default 0.3)")
+    parser.add_argument('--memory-tolerance', type=float, default=0.2, help="Allowed peak memory growth per stage as a fraction (default 0.2)")
+    parser.add_argument('--checks-only', action='store_true', help="Only run the output and import checks, without timing anything, as CI does")
+    args = parser.parse_args()
+
+    specs = scaled_specs(args.scale)
+    with tempfile.TemporaryDirectory(prefix='font-mate-bench-') as work_dir:
+        font_paths = generate_fonts(work_dir, specs)
+        # The stages print progress bars and compiler warnings; keep them out of the benchmark report
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull), contextlib.redirect_stderr(devnull):
+            if not args.checks_only:
+                seconds = time_stages(font_paths, work_dir, args.repeat)
+                peaks = trace_stages(font_paths, work_dir)
+            compile_mismatches = check_parallel_compile(font_paths, work_dir)
+            glyph_set_mismatches = check_keep_non_bmp(font_paths, work_dir)
+        commands = startup_commands(font_paths[0], work_dir)
+        if not args.checks_only:
+            seconds.update(time_startup(commands, args.repeat))
+        import_regressions = check_startup_imports(commands)
+
+    failures = [
+        ("Startup import regressions", import_regressions),
+        ("Parallel compile mismatches", compile_mismatches),
+        ("Glyph set mismatches", glyph_set_mismatches),
+    ]
+    if args.checks_only:
+        report_failures(failures)
+        print("All checks passed.")
+        return
+
+    # The memory of a child process is not traced
+    peaks.update(dict.fromkeys(commands, 0.0))
+    results = {
+        'fonts': specs,
+        'stages': {stage: {'seconds': round(seconds[stage], 4), 'peak_mb': round(peaks[stage], 2)} for stage in seconds},
+    }
+    if any(messages for _, messages in failures):
+        print_results(results)
+        report_failures(failures)
+
+    if args.update_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+            f.write('\n')
+        print_results(results)
+        print(f"Baseline written to {args.baseline}")
+        return
+
+    try:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+    except FileNotFoundError:
+        sys.exit(f"Error: no baseline at {args.baseline}; run with --update-baseline first.")
+
+    print_results(results, baseline)
+    if baseline.get('fonts') != specs:
+        sys.exit("Error: the synthetic fonts differ from the ones the baseline was recorded with; "
+                 "rerun with the same --scale or update the baseline.")
+
+    regressions = compare(results, baseline, args.time_tolerance, args.memory_tolerance)
+    if regressions:
+        print("\nPerformance regressions:", file=sys.stderr)
+        for message in regressions:
+            print(f"  {message}", file=sys.stderr)
+        sys.exit(1)
+    print("\nNo regressions against the baseline.")
+
+
+if __name__ == '__main__':
+    main()
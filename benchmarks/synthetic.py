@@ -0,0 +1,92 @@
+import random
+
+from fontTools.fontBuilder import FontBuilder
+from fontTools.pens.ttGlyphPen import TTGlyphPen
+
+UNITS_PER_EM = 1000
+ADVANCE_WIDTH = 1000
+
+
+def draw_simple_glyph(rng: random.Random):
+    """Draws one to four closed quadratic contours at random positions."""
+    pen = TTGlyphPen(None)
+    for _ in range(rng.randint(1, 4)):
+        x = rng.randint(50, 600)
+        y = rng.randint(-100, 500)
+        w = rng.randint(50, 300)
+        h = rng.randint(50, 300)
+        pen.moveTo((x, y))
+        pen.qCurveTo((x, y + h // 2), (x + w // 2, y + h))
+        pen.lineTo((x + w, y + h))
+        pen.qCurveTo((x + w, y + h // 2), (x + w // 2, y))
+        pen.closePath()
+    return pen.glyph()
+
+
+def draw_composite_glyph(rng: random.Random, simple_names: list[str], glyphs: dict):
+    """References one to three simple glyphs with random offsets and occasional scaling."""
+    pen = TTGlyphPen(glyphs)
+    for base_glyph in rng.sample(simple_names, min(len(simple_names), rng.randint(1, 3))):
+        scale = 1 if rng.random() < 0.8 else 0.5
+        pen.addComponent(base_glyph, (scale, 0, 0, scale, rng.randint(-50, 50), rng.randint(-50, 50)))
+    return pen.glyph()
+
+
+def pick_codepoints(rng: random.Random, count: int, start: int, spread: int, non_bmp_share: float) -> list[int]:
+    """
+    Picks distinct codepoints: a `non_bmp_share` of them from CJK Extension B
+    (U+20000), the rest from `spread` codepoints starting at `start`, skipping surrogates.
+    """
+    non_bmp_count = int(round(count * non_bmp_share))
+    bmp_pool = [cp for cp in range(start, min(start + max(spread, count), 0x10000)) if not 0xD800 <= cp <= 0xDFFF]
+    bmp = rng.sample(bmp_pool, min(count - non_bmp_count, len(bmp_pool)))
+    non_bmp = rng.sample(range(0x20000, 0x2A6E0), non_bmp_count)
+    return sorted(bmp + non_bmp)
+
+
+def make_synthetic_font(
+    path: str,
+    glyph_count: int = 2000,
+    composite_ratio: float = 0.2,
+    codepoint_start: int = 0x4E00,
+    codepoint_spread: int = 20000,
+    non_bmp_share: float = 0.05,
+    unencoded_share: float = 0.05,
+    seed: int = 0,
+    family_name: str = "Synthetic",
+):
+    """
+    Writes a TrueType font of `glyph_count` glyphs with random quadratic outlines.
+
+    A `composite_ratio` share of the glyphs are composites of simple glyphs, an
+    `unencoded_share` are left out of the cmap, and the encoded glyphs get codepoints
+    as described in `pick_codepoints`. The same arguments always produce the same font.
+    """
+    rng = random.Random(seed)
+    encoded_count = sum(1 for _ in range(1, glyph_count) if rng.random() >= unencoded_share)
+    codepoints = pick_codepoints(rng, encoded_count, codepoint_start, codepoint_spread, non_bmp_share)
+    # Name glyphs the way production fonts do, so equal names across fonts mean equal codepoints
+    cmap = {codepoint: (f"uni{codepoint:04X}" if codepoint <= 0xFFFF else f"u{codepoint:05X}") for codepoint in codepoints}
+    unencoded_names = [f"{family_name.replace(' ', '')}.{i:05d}" for i in range(glyph_count - 1 - len(cmap))]
+    glyph_order = ['.notdef'] + sorted(cmap.values()) + unencoded_names
+
+    composite_count = int(glyph_count * composite_ratio)
+    composite_names = set(rng.sample(glyph_order[1:], min(composite_count, glyph_count - 2)))
+    simple_names = [name for name in glyph_order if name not in composite_names]
+
+    glyphs = {name: draw_simple_glyph(rng) for name in simple_names}
+    for name in glyph_order:
+        if name in composite_names:
+            glyphs[name] = draw_composite_glyph(rng, simple_names[1:], glyphs)
+
+    builder = FontBuilder(UNITS_PER_EM, isTTF=True)
+    builder.setupGlyphOrder(glyph_order)
+    builder.setupCharacterMap(cmap)
+    builder.setupGlyf(glyphs)
+    glyf_table = builder.font['glyf']
+    builder.setupHorizontalMetrics({name: (ADVANCE_WIDTH, getattr(glyf_table[name], 'xMin', 0)) for name in glyph_order})
+    builder.setupHorizontalHeader(ascent=880, descent=-120)
+    builder.setupNameTable({"familyName": family_name, "styleName": "Regular"})
+    builder.setupOS2(sTypoAscender=880, sTypoDescender=-120, usWinAscent=880, usWinDescent=120)
+    builder.setupPost()
+    builder.save(path)
@@ -1,4 +1,16 @@
-from .merge import merge_fonts
-from .coverage import coverage_analysis
+import importlib
 
-__all__ = ["merge_fonts", "coverage_analysis"]
+__all__ = ["merge_fonts", "coverage_analysis", "coverage_batch"]
+
+# Each command imports only the module it runs: `coverage` never loads ufoLib2 and ufo2ft
+_EXPORT_MODULES = {
+    "merge_fonts": ".merge",
+    "coverage_analysis": ".coverage",
+    "coverage_batch": ".coverage",
+}
+
+
+def __getattr__(name):
+    if name not in _EXPORT_MODULES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(_EXPORT_MODULES[name], __name__), name)
@@ -0,0 +1,139 @@
+import contextlib
+import io
+import sys
+from pathlib import Path
+
+from .cache import MemoryFontCache
+from .merge import merge_fonts, default_output_path, filter_ranges, input_loader
+from .parallel import load_fonts, process_pool, resolve_jobs
+from .profile import profile_stage
+from .profiles import read_config_file
+
+# The fallback data of a batch, inherited by the worker processes that merge its targets
+_shared_cache = None
+
+
+class FallbackCache(MemoryFontCache):
+    """
+    Holds the decoded and filtered fallbacks of a batch for every target to copy from.
+    Each base font is read by one target only, so base fonts are not kept.
+    """
+
+    caches_base_font = False
+
+    def __init__(self):
+        super().__init__(max_bytes=sys.maxsize)
+
+
+def read_batch_manifest(path: str) -> tuple[list[str], list[tuple[str, str]]]:
+    """
+    Reads a batch manifest: a TOML or JSON file with a `fallbacks` list of font paths and a
+    `targets` list, whose entries are base font paths or tables with `base` and optional `output`.
+    Relative paths are resolved against the manifest's directory.
+
+    Returns:
+        The fallback paths and a (base path, output path) pair per target.
+    """
+    data = read_config_file(path)
+    root = Path(path).parent
+
+    def resolve(value, what):
+        if not isinstance(value, str):
+            raise ValueError(f"{path}: {what} must be a path, not {value!r}")
+        return str(root / value)
+
+    if not isinstance(data, dict) or not isinstance(data.get('targets'), list) or not data['targets']:
+        raise ValueError(f"{path} needs a non-empty 'targets' list")
+    fallbacks = [resolve(fallback, "every fallback") for fallback in data.get('fallbacks', [])]
+
+    targets = []
+    for target in data['targets']:
+        if isinstance(target, dict):
+            unknown = set(target) - {'base', 'output'}
+            if unknown:
+                raise ValueError(f"{path}: unknown target keys: {', '.join(sorted(unknown))}")
+            base = resolve(target.get('base'), "a target's base")
+            output = resolve(target['output'], "a target's output") if 'output' in target else None
+        else:
+            base = resolve(target, "a target")
+            output = None
+        targets.append((base, output or str(root / default_output_path(base))))
+
+    outputs = [output for _, output in targets]
+    if len(set(outputs)) != len(outputs):
+        raise ValueError(f"{path}: several targets write the same output")
+    return fallbacks, targets
+
+
+def _init_worker(cache: FallbackCache):
+    global _shared_cache
+    _shared_cache = cache
+
+
+def _merge_target(base: str, output: str, fallbacks: list[str], options: dict) -> tuple[int, list[str]]:
+    """Merges one target quietly; returns the exit code and the error messages the merge printed."""
+    # Progress from several targets would garble each other on one console
+    merge_output = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(merge_output), contextlib.redirect_stderr(merge_output):
+            merge_fonts([base] + fallbacks, output, font_cache=_shared_cache, **options)
+    except SystemExit as e:
+        if e.code:
+            return e.code, [line for line in merge_output.getvalue().splitlines() if line.startswith("Error:")]
+    return 0, []
+
+
+def merge_batch(targets: list[tuple[str, str]], fallbacks: list[str], jobs=1, font_cache: MemoryFontCache = None, **options):
+    """
+    Merges every (base, output) target with the same fallbacks, reading each fallback once.
+
+    The fallbacks are decoded and filtered up front, with `jobs` worker processes, into an
+    in-memory cache (`font_cache` if given) from which every target takes a fresh copy, so
+    no target re-reads them. With more than one job the targets are then merged in worker
+    processes, which inherit the cache rather than receiving a copy where the platform forks.
+    Jobs left over once every concurrent target has one go to each target's own merge, for
+    its `--fast-compile` worker processes. `options` are passed on to `merge_fonts` for every target.
+    """
+    cache = font_cache if font_cache is not None else FallbackCache()
+
+    if fallbacks:
+        subset_ranges = options.get('subset_ranges')
+        ranges = filter_ranges(options.get('keep_all_ranges', False), options.get('removed_ranges'))
+        loader, loader_args = input_loader(
+            ranges,
+            options.get('keep_non_bmp', False),
+            None if subset_ranges is None else [tuple(r) for r in subset_ranges],
+            packed=True,
+            direct=options.get('direct', False),
+            low_memory=options.get('low_memory', False),
+        )
+        print(f"Reading {len(fallbacks)} shared fallback fonts...")
+        with profile_stage('read shared fallbacks') as stage:
+            for _ in load_fonts(fallbacks, loader, *loader_args, jobs=jobs, cache=cache, first_is_base=False):
+                pass
+            stage.glyphs = len(fallbacks)
+
+    total_jobs = resolve_jobs(jobs, sys.maxsize)
+    jobs = resolve_jobs(jobs, len(targets))
+    options = dict(options, jobs=max(1, total_jobs // jobs))
+    if jobs == 1:
+        for i, (base, output) in enumerate(targets, start=1):
+            print(f"Merging target {i} of {len(targets)}: {base}")
+            with profile_stage('merge target', font=base):
+                merge_fonts([base] + fallbacks, output, font_cache=cache, **options)
+        print(f"Merged {len(targets)} targets.")
+        return
+
+    print(f"Merging {len(targets)} targets with {jobs} worker processes...")
+    with process_pool(jobs, initializer=_init_worker, initargs=(cache,)) as executor:
+        futures = [executor.submit(_merge_target, base, output, fallbacks, options) for base, output in targets]
+        for (base, output), future in zip(targets, futures):
+            with profile_stage('wait for target', font=base):
+                exit_code, errors = future.result()
+            if exit_code:
+                for line in errors:
+                    print(line)
+                print(f"Error: Merging {base} failed.")
+                sys.exit(exit_code)
+            print(f"Merged {base} into: {output}")
+    print(f"Merged {len(targets)} targets.")
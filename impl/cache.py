@@ -0,0 +1,156 @@
+import hashlib
+import os
+import pickle
+import sys
+import tempfile
+from collections import OrderedDict
+from pathlib import Path
+
+CACHE_DIR_ENV = "FONT_MATE_CACHE_DIR"
+DEFAULT_CACHE_SIZE_MB = 1024
+DEFAULT_MEMORY_CACHE_SIZE_MB = 512
+
+# Bump whenever the layout of cached loader results changes
+CACHE_FORMAT_VERSION = 1
+
+
+def file_sha256(path: str) -> str:
+    """Returns the SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class FontCache:
+    """
+    Size-bounded on-disk cache of decoded and filtered input fonts.
+
+    Entries are pickled loader results keyed by the font's SHA-256, the loader and
+    its arguments (which carry the filter settings). Hits refresh the entry's mtime,
+    and the least recently used entries are evicted once the directory grows past
+    `max_bytes`.
+    """
+
+    caches_base_font = False
+    # Workers read and write the cache directory themselves
+    shared_with_workers = True
+
+    def __init__(self, cache_dir: str, max_bytes: int = DEFAULT_CACHE_SIZE_MB << 20):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+
+    def entry_path(self, loader, font_path: str, args: tuple) -> Path:
+        key = f"{CACHE_FORMAT_VERSION}|{loader.__module__}.{loader.__qualname__}|{file_sha256(font_path)}|{args!r}"
+        return self.cache_dir / f"{hashlib.sha256(key.encode()).hexdigest()}.pickle"
+
+    def load(self, loader, font_path: str, *args):
+        """Returns the cached result of `loader(font_path, *args)`, computing and storing it on a miss."""
+        path = self.entry_path(loader, font_path, args)
+        try:
+            with open(path, 'rb') as f:
+                result = pickle.load(f)
+            os.utime(path)
+            print(f"Using cached data for: {font_path}")
+            return result
+        except FileNotFoundError:
+            pass
+        except (pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            # Written by an incompatible version or truncated; recompute it
+            path.unlink(missing_ok=True)
+
+        result = loader(font_path, *args)
+        self.store(path, result)
+        self.evict()
+        return result
+
+    def store(self, path: Path, result):
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        # Write to a temporary file first so concurrent workers never read partial entries
+        fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, path)
+
+    def evict(self):
+        """Removes least recently used entries until the cache fits in `max_bytes`."""
+        entries = []
+        for path in self.cache_dir.glob('*.pickle'):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue  # Evicted concurrently by another worker
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total_bytes = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+            if total_bytes <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total_bytes -= size
+
+
+class MemoryFontCache:
+    """
+    Size-bounded in-memory cache of loader results, for a long-running process.
+
+    Takes the place of `FontCache` where one process handles many requests. Entries
+    are keyed by the font's path, size, mtime and inode rather than a content hash,
+    so a warm lookup does not read the font at all. They are kept pickled: the size
+    limit is exact, and every hit hands out a fresh copy that callers may modify.
+    The least recently used entries are dropped once the total exceeds `max_bytes`.
+    """
+
+    # Keyed by file identity, so the base font, which is the one usually being edited, is cached too
+    caches_base_font = True
+    # Lives in this process only; worker processes get the misses and this process stores their results
+    shared_with_workers = False
+
+    def __init__(self, max_bytes: int = DEFAULT_MEMORY_CACHE_SIZE_MB << 20):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def entry_key(loader, font_path: str, args: tuple) -> tuple:
+        stat = os.stat(font_path)
+        return (f"{loader.__module__}.{loader.__qualname__}", os.path.realpath(font_path), stat.st_size, stat.st_mtime_ns, stat.st_ino,
+                repr(args))
+
+    def get(self, loader, font_path: str, *args):
+        """Returns the cached result of `loader(font_path, *args)`, or None on a miss."""
+        key = self.entry_key(loader, font_path, args)
+        data = self.entries.get(key)
+        if data is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        # Not on stdout, which may carry a coverage report
+        print(f"Using cached data for: {font_path}", file=sys.stderr)
+        return pickle.loads(data)
+
+    def put(self, loader, font_path: str, args: tuple, result):
+        key = self.entry_key(loader, font_path, args)
+        data = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(data) > self.max_bytes:
+            return  # Would evict everything else and still not fit
+        previous = self.entries.pop(key, None)
+        if previous is not None:
+            self.total_bytes -= len(previous)
+        self.entries[key] = data
+        self.total_bytes += len(data)
+        while self.total_bytes > self.max_bytes:
+            _, evicted = self.entries.popitem(last=False)
+            self.total_bytes -= len(evicted)
+
+    def load(self, loader, font_path: str, *args):
+        """Returns the cached result of `loader(font_path, *args)`, computing and storing it on a miss."""
+        result = self.get(loader, font_path, *args)
+        if result is None:
+            result = loader(font_path, *args)
+            self.put(loader, font_path, args, result)
+        return result
@@ -0,0 +1,79 @@
+MAX_CODEPOINT = 0x10FFFF
+BITMAP_SIZE = (MAX_CODEPOINT + 1) // 8
+
+
+def _popcount(value: int) -> int:
+    return value.bit_count() if hasattr(value, 'bit_count') else bin(value).count('1')
+
+
+class CodepointSet:
+    """
+    Set of Unicode codepoints stored as a 0x110000-bit bitmap (136 KiB).
+
+    Membership is a single byte test, and union, intersection and difference run
+    over the whole bitmap at once as big-integer operations, so large coverage
+    sets cost neither per-codepoint Python objects nor per-codepoint loops.
+    """
+
+    __slots__ = ('bits',)
+
+    def __init__(self, codepoints=()):
+        self.bits = bytearray(BITMAP_SIZE)
+        self.update(codepoints)
+
+    @classmethod
+    def _from_int(cls, value: int) -> 'CodepointSet':
+        result = cls()
+        result.bits[:] = value.to_bytes(BITMAP_SIZE, 'little')
+        return result
+
+    def _to_int(self) -> int:
+        return int.from_bytes(self.bits, 'little')
+
+    def add(self, codepoint: int):
+        self.bits[codepoint >> 3] |= 1 << (codepoint & 7)
+
+    def update(self, codepoints):
+        bits = self.bits
+        for codepoint in codepoints:
+            bits[codepoint >> 3] |= 1 << (codepoint & 7)
+
+    def __contains__(self, codepoint: int) -> bool:
+        return 0 <= codepoint <= MAX_CODEPOINT and bool(self.bits[codepoint >> 3] & (1 << (codepoint & 7)))
+
+    def __len__(self) -> int:
+        return _popcount(self._to_int())
+
+    def __iter__(self):
+        for index, byte in enumerate(self.bits):
+            if byte:
+                for bit in range(8):
+                    if byte & (1 << bit):
+                        yield (index << 3) | bit
+
+    def __or__(self, other: 'CodepointSet') -> 'CodepointSet':
+        return CodepointSet._from_int(self._to_int() | other._to_int())
+
+    def __and__(self, other: 'CodepointSet') -> 'CodepointSet':
+        return CodepointSet._from_int(self._to_int() & other._to_int())
+
+    def __sub__(self, other: 'CodepointSet') -> 'CodepointSet':
+        return CodepointSet._from_int(self._to_int() & ~other._to_int())
+
+    def __ior__(self, other: 'CodepointSet') -> 'CodepointSet':
+        self.bits[:] = (self._to_int() | other._to_int()).to_bytes(BITMAP_SIZE, 'little')
+        return self
+
+    def isdisjoint(self, other: 'CodepointSet') -> bool:
+        return not self._to_int() & other._to_int()
+
+    def count_in_range(self, start: int, end: int) -> int:
+        """Counts the codepoints in the inclusive range by popcounting the bitmap bytes that span it."""
+        chunk = int.from_bytes(self.bits[start >> 3:(end >> 3) + 1], 'little')
+        chunk >>= start & 7
+        chunk &= (1 << (end - start + 1)) - 1
+        return _popcount(chunk)
+
+    def count_ranges(self, ranges) -> list[int]:
+        """Returns the number of codepoints in each (start, end, ...) range, in the order given."""
+        return [self.count_in_range(start, end) for start, end, *_ in ranges]
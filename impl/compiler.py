@@ -0,0 +1,324 @@
+import math
+import struct
+
+import ufoLib2
+from fontTools.fontBuilder import FontBuilder
+from fontTools.misc.roundTools import noRound, otRound
+from fontTools.pens.cu2quPen import Cu2QuPointPen
+from fontTools.pens.filterPen import FilterPointPen
+from fontTools.pens.pointPen import ReverseContourPointPen
+from fontTools.pens.ttGlyphPen import TTGlyphPointPen
+from fontTools.ttLib import TTFont, newTable
+from fontTools.ttLib.tables._c_m_a_p import CmapSubtable
+from fontTools.ttLib.tables._g_l_y_f import USE_MY_METRICS, Glyph as TTGlyph
+from ufo2ft.fontInfoData import getAttrWithFallback, intListToNum, normalizeStringForPostscript
+from ufo2ft.outlineCompiler import StubGlyph
+from ufo2ft.util import makeOfficialGlyphOrder
+from ufoLib2.objects import Glyph
+
+from .parallel import process_pool, resolve_jobs
+from .utils import pack_glyph, unpack_glyph
+
+# Same default as ufo2ft, in font units
+CU2QU_MAX_ERR = 1.0
+
+# Batches of glyphs per worker process, so that workers finishing early pick up the remaining ones
+BATCHES_PER_JOB = 4
+
+# (platformID, platEncID) of the cmap subtables ufo2ft writes, by format
+CMAP_SUBTABLE_IDS = {4: [(0, 3), (3, 1)], 12: [(0, 4), (3, 10)]}
+
+# fsSelection bits implied by the style-map style name, as ufo2ft sets them
+STYLE_MAP_SELECTION_BITS = {'regular': [6], 'bold': [5], 'italic': [0], 'bold italic': [0, 5]}
+
+
+class ExistingComponentsPointPen(FilterPointPen):
+    """Passes everything through except components whose base glyph is not in the font, as ufo2ft drops them."""
+
+    def __init__(self, out_pen, ufo_font: ufoLib2.Font):
+        super().__init__(out_pen)
+        self.ufo_font = ufo_font
+
+    def addComponent(self, baseGlyphName, transformation, **kwargs):
+        if baseGlyphName in self.ufo_font:
+            self._outPen.addComponent(baseGlyphName, transformation, **kwargs)
+
+
+def is_cubic(glyph) -> bool:
+    return any(point.type == 'curve' for contour in getattr(glyph, 'contours', ()) for point in contour)
+
+
+def compile_glyph(glyph, ufo_font: ufoLib2.Font):
+    """
+    Compiles one UFO glyph to a TrueType glyph. Cubic contours, which fonts converted
+    from TrueType never have, are converted to quadratic ones on the fly.
+    """
+    tt_pen = TTGlyphPointPen(ufo_font)
+    # ufo2ft reverses every contour from the UFO direction to the TrueType one; so do we, to match its outlines
+    pen = ReverseContourPointPen(tt_pen)
+    if is_cubic(glyph):
+        pen = Cu2QuPointPen(pen, CU2QU_MAX_ERR)
+    glyph.drawPoints(ExistingComponentsPointPen(pen, ufo_font))
+    return tt_pen.glyph()
+
+
+class CompiledGlyph(TTGlyph):
+    """
+    A simple glyph compiled to its glyf record by a worker process. The bounds, contour
+    and point counts that FontBuilder, maxp and hhea read come from the record's header,
+    so the outline is only decoded if a composite needs its coordinates, and saving
+    writes the record as it is.
+    """
+
+    def __init__(self, record: bytes):
+        self.record = record
+        self.numberOfContours, self.xMin, self.yMin, self.xMax, self.yMax = struct.unpack_from('>5h', record)
+        # One past the end point of the last contour
+        self.point_count = struct.unpack_from('>H', record, 8 + 2 * self.numberOfContours)[0] + 1
+
+    def recalcBounds(self, glyfTable, *, boundsDone=None):
+        pass  # The worker did, before compiling the record
+
+    def getMaxpValues(self):
+        return self.point_count, self.numberOfContours
+
+    def getCoordinates(self, glyfTable, *, round=noRound):
+        if not hasattr(self, 'coordinates'):
+            decoded = TTGlyph(self.record)
+            decoded.expand(glyfTable)
+            self.coordinates, self.endPtsOfContours, self.flags = decoded.coordinates, decoded.endPtsOfContours, decoded.flags
+        return super().getCoordinates(glyfTable, round=round)
+
+    def compile(self, glyfTable, recalcBBoxes=True, **kwargs):
+        return self.record
+
+
+def _compile_packed_glyphs(records: list[tuple]) -> list[bytes]:
+    """Draws, converts and compiles packed simple glyphs in a worker process; returns their glyf records."""
+    compiled = []
+    for record in records:
+        # Simple glyphs draw no components, so no glyph set is needed
+        tt_glyph = compile_glyph(unpack_glyph(record), {})
+        # Bounds as FontBuilder.setupGlyf sets them, then the record as saving the font compiles it
+        tt_glyph.recalcBounds(None)
+        compiled.append(tt_glyph.compile(None, recalcBBoxes=False))
+    return compiled
+
+
+def compile_glyphs_parallel(glyph_set: dict, glyph_order: list[str], ufo_font: ufoLib2.Font, jobs: int) -> dict:
+    """
+    Compiles every glyph as `compile_glyph` does, with the simple glyphs split into batches
+    of consecutive glyphs that worker processes draw, convert and compile to glyf records.
+    Glyphs converted from TrueType are sent as their source records, so nothing is drawn
+    here, and only the compiled records come back. Composites, which may need the outlines
+    of other glyphs, are compiled here.
+
+    Returns:
+        The TrueType glyphs by name, in glyph order, simple ones as `CompiledGlyph`.
+    """
+    simple_names = [
+        glyph_name for glyph_name in glyph_order
+        if isinstance(glyph_set[glyph_name], Glyph) and not glyph_set[glyph_name].components
+    ]
+    jobs = resolve_jobs(jobs, len(simple_names))
+    batch_size = -(-len(simple_names) // (jobs * BATCHES_PER_JOB))
+    batches = [simple_names[i:i + batch_size] for i in range(0, len(simple_names), batch_size)]
+
+    print(f"Compiling {len(simple_names)} glyphs with {jobs} worker processes...")
+    compiled = {}
+    with process_pool(jobs) as executor:
+        packed_batches = ([pack_glyph(glyph_set[glyph_name]) for glyph_name in batch] for batch in batches)
+        for batch, records in zip(batches, executor.map(_compile_packed_glyphs, packed_batches)):
+            for glyph_name, record in zip(batch, records):
+                compiled[glyph_name] = CompiledGlyph(record) if record else TTGlyph()
+
+    return {
+        glyph_name: compiled[glyph_name] if glyph_name in compiled else compile_glyph(glyph_set[glyph_name], ufo_font)
+        for glyph_name in glyph_order
+    }
+
+
+def set_use_my_metrics(tt_glyph, widths: dict[str, int], width: int):
+    """
+    Flags the first component with the composite's advance and no transformation or
+    horizontal shift as the source of its metrics, as ufo2ft does.
+    """
+    for component in tt_glyph.components:
+        if not hasattr(component, 'x'):
+            continue  # Positioned by matching points
+        base_glyph, transform = component.getComponentInfo()
+        if widths.get(base_glyph) == width and transform[:-1] == (1, 0, 0, 1, 0):
+            component.flags |= USE_MY_METRICS
+            return
+
+
+def notdef_glyph(info) -> StubGlyph:
+    """Returns the .notdef glyph ufo2ft draws for fonts that have none: a box half an em wide."""
+    return StubGlyph(
+        name='.notdef',
+        width=otRound(getAttrWithFallback(info, 'unitsPerEm') * 0.5),
+        unitsPerEm=otRound(getAttrWithFallback(info, 'unitsPerEm')),
+        ascender=otRound(getAttrWithFallback(info, 'ascender')),
+        descender=otRound(getAttrWithFallback(info, 'descender')),
+        reverseContour=False,  # Reversed with every other glyph by compile_glyph
+    )
+
+
+def fs_selection(info) -> int:
+    selection = list(getAttrWithFallback(info, 'openTypeOS2Selection'))
+    selection += STYLE_MAP_SELECTION_BITS.get(getAttrWithFallback(info, 'styleMapStyleName'), [])
+    return intListToNum(selection, 0, 16)
+
+
+def os2_values(info) -> dict:
+    """Returns the OS/2 fields ufo2ft derives from the font info, with its fallbacks for unset values."""
+    units_per_em = getAttrWithFallback(info, 'unitsPerEm')
+    italic_angle = float(getAttrWithFallback(info, 'italicAngle'))
+    x_height = getAttrWithFallback(info, 'xHeight')
+
+    def value(attr, fallback):
+        v = getAttrWithFallback(info, attr)
+        return otRound(fallback if v is None else v)
+
+    def italic_offset(y_offset):
+        return y_offset * math.tan(math.radians(-italic_angle)) if italic_angle else 0
+
+    values = {
+        'version': 4,
+        'usWeightClass': getAttrWithFallback(info, 'openTypeOS2WeightClass'),
+        'usWidthClass': getAttrWithFallback(info, 'openTypeOS2WidthClass'),
+        'fsType': intListToNum(getAttrWithFallback(info, 'openTypeOS2Type'), 0, 16),
+        'ySubscriptXSize': value('openTypeOS2SubscriptXSize', units_per_em * 0.65),
+        'ySubscriptYSize': value('openTypeOS2SubscriptYSize', units_per_em * 0.6),
+        'ySubscriptYOffset': value('openTypeOS2SubscriptYOffset', units_per_em * 0.075),
+        'ySuperscriptYOffset': value('openTypeOS2SuperscriptYOffset', units_per_em * 0.35),
+        'yStrikeoutSize': value('openTypeOS2StrikeoutSize', getAttrWithFallback(info, 'postscriptUnderlineThickness')),
+        'yStrikeoutPosition': value('openTypeOS2StrikeoutPosition', x_height * 0.6 if x_height else units_per_em * 0.22),
+        'achVendID': getAttrWithFallback(info, 'openTypeOS2VendorID').ljust(4),
+        'sxHeight': otRound(x_height),
+        'sCapHeight': otRound(getAttrWithFallback(info, 'capHeight')),
+        'sTypoAscender': otRound(getAttrWithFallback(info, 'openTypeOS2TypoAscender')),
+        'sTypoDescender': otRound(getAttrWithFallback(info, 'openTypeOS2TypoDescender')),
+        'sTypoLineGap': otRound(getAttrWithFallback(info, 'openTypeOS2TypoLineGap')),
+        'usWinAscent': otRound(getAttrWithFallback(info, 'openTypeOS2WinAscent')),
+        'usWinDescent': otRound(getAttrWithFallback(info, 'openTypeOS2WinDescent')),
+        'usDefaultChar': 0,
+        'usBreakChar': 32,
+        'usMaxContext': 0,
+    }
+    values['ySubscriptXOffset'] = value('openTypeOS2SubscriptXOffset', italic_offset(-values['ySubscriptYOffset']))
+    values['ySuperscriptXSize'] = value('openTypeOS2SuperscriptXSize', values['ySubscriptXSize'])
+    values['ySuperscriptYSize'] = value('openTypeOS2SuperscriptYSize', values['ySubscriptYSize'])
+    values['ySuperscriptXOffset'] = value('openTypeOS2SuperscriptXOffset', italic_offset(values['ySuperscriptYOffset']))
+    return values
+
+
+def character_map_table(cmap: dict[int, str]):
+    """
+    Returns a cmap table laid out as ufo2ft's: format 4 subtables for the BMP codepoints and,
+    when any codepoint lies above it, format 12 subtables holding every codepoint.
+    """
+    bmp = {codepoint: glyph_name for codepoint, glyph_name in cmap.items() if codepoint <= 0xFFFF}
+    subtables = [(4, bmp)] if bmp else []
+    if len(bmp) < len(cmap):
+        subtables.append((12, cmap))
+    cmap_table = newTable('cmap')
+    cmap_table.tableVersion = 0
+    cmap_table.tables = []
+    for subtable_format, mapping in subtables:
+        for platform_id, encoding_id in CMAP_SUBTABLE_IDS[subtable_format]:
+            subtable = CmapSubtable.newSubtable(subtable_format)
+            subtable.platformID = platform_id
+            subtable.platEncID = encoding_id
+            subtable.language = 0
+            subtable.cmap = mapping
+            cmap_table.tables.append(subtable)
+    return cmap_table
+
+
+def compile_ufo_fast(ufo_font: ufoLib2.Font, jobs=1) -> TTFont:
+    """
+    Compiles a UFO font whose glyphs came from TrueType fonts, without the ufo2ft pipeline.
+
+    The outlines are already quadratic, so the cu2qu and filter passes, the copy of the
+    glyph layer they work on and the feature compiler are skipped, and each glyph is
+    drawn once. Fonts made by `convert_ttfont_to_ufo` carry no features, kerning or
+    hinting, and only the font info it sets; for them the result is the same font
+    `compileTTF` builds, with the same fallbacks for every unset font info value.
+
+    With more than one job, simple glyphs are compiled by `compile_glyphs_parallel`, and
+    saving recalculates the bounds and maxima from the headers of the workers' glyf
+    records. The saved font is byte-for-byte the one a single job builds.
+    """
+    info = ufo_font.info
+    glyph_set = {glyph.name: glyph for glyph in ufo_font}
+    if '.notdef' not in glyph_set:
+        glyph_set['.notdef'] = notdef_glyph(info)
+    glyph_order = makeOfficialGlyphOrder(glyph_set, ufo_font.glyphOrder)
+
+    fb = FontBuilder(getAttrWithFallback(info, 'unitsPerEm'), isTTF=True)
+    fb.setupGlyphOrder(glyph_order)
+
+    cmap = {}
+    for glyph_name in glyph_order:
+        for unicode_val in glyph_set[glyph_name].unicodes:
+            cmap.setdefault(unicode_val, glyph_name)
+    fb.font['cmap'] = character_map_table(cmap)
+
+    if resolve_jobs(jobs, len(glyph_order)) > 1:
+        glyphs = compile_glyphs_parallel(glyph_set, glyph_order, ufo_font, jobs)
+    else:
+        glyphs = {glyph_name: compile_glyph(glyph_set[glyph_name], ufo_font) for glyph_name in glyph_order}
+    fb.setupGlyf(glyphs, validateGlyphFormat=False)
+    glyf_table = fb.font['glyf']
+    widths = {glyph_name: otRound(glyph_set[glyph_name].width) for glyph_name in glyph_order}
+    for glyph_name, tt_glyph in glyphs.items():
+        if tt_glyph.isComposite():
+            set_use_my_metrics(tt_glyph, widths, widths[glyph_name])
+    fb.setupHorizontalMetrics({glyph_name: (widths[glyph_name], getattr(glyf_table[glyph_name], 'xMin', 0)) for glyph_name in glyph_order})
+
+    style_map_style = getAttrWithFallback(info, 'styleMapStyleName')
+    fb.updateHead(
+        fontRevision=round(float(f"{getAttrWithFallback(info, 'versionMajor')}.{getAttrWithFallback(info, 'versionMinor'):03d}"), 3),
+        macStyle=('bold' in style_map_style) | ('italic' in style_map_style) << 1,
+        flags=intListToNum(getAttrWithFallback(info, 'openTypeHeadFlags'), 0, 16),
+        lowestRecPPEM=getAttrWithFallback(info, 'openTypeHeadLowestRecPPEM'),
+    )
+    fb.setupHorizontalHeader(
+        ascent=otRound(getAttrWithFallback(info, 'openTypeHheaAscender')),
+        descent=otRound(getAttrWithFallback(info, 'openTypeHheaDescender')),
+        lineGap=otRound(getAttrWithFallback(info, 'openTypeHheaLineGap')),
+        caretSlopeRise=getAttrWithFallback(info, 'openTypeHheaCaretSlopeRise'),
+        caretSlopeRun=getAttrWithFallback(info, 'openTypeHheaCaretSlopeRun'),
+        caretOffset=otRound(getAttrWithFallback(info, 'openTypeHheaCaretOffset')),
+    )
+
+    family_name = getAttrWithFallback(info, 'styleMapFamilyName')
+    style_name = style_map_style.title()
+    typographic_family = getAttrWithFallback(info, 'openTypeNamePreferredFamilyName')
+    typographic_subfamily = getAttrWithFallback(info, 'openTypeNamePreferredSubfamilyName')
+    names = {
+        'familyName': family_name,
+        'styleName': style_name,
+        'uniqueFontIdentifier': getAttrWithFallback(info, 'openTypeNameUniqueID'),
+        'fullName': f"{typographic_family} {typographic_subfamily}".strip(),
+        'version': getAttrWithFallback(info, 'openTypeNameVersion'),
+        'psName': normalizeStringForPostscript(getAttrWithFallback(info, 'postscriptFontName')),
+    }
+    if (family_name, style_name) != (typographic_family, typographic_subfamily):
+        names['typographicFamily'] = typographic_family
+        names['typographicSubfamily'] = typographic_subfamily
+    fb.setupNameTable(names, mac=False)
+
+    fb.setupOS2(**os2_values(info), fsSelection=fs_selection(info))
+    fb.font['OS/2'].recalcCodePageRanges(fb.font)
+
+    fb.setupPost(
+        underlinePosition=otRound(getAttrWithFallback(info, 'postscriptUnderlinePosition')),
+        underlineThickness=otRound(getAttrWithFallback(info, 'postscriptUnderlineThickness')),
+        italicAngle=float(getAttrWithFallback(info, 'italicAngle')),
+        isFixedPitch=int(bool(getAttrWithFallback(info, 'postscriptIsFixedPitch'))),
+    )
+    fb.setupMaxp()
+    fb.font['maxp'].maxZones = 1  # No twilight zone; ufo2ft sets the same
+    return fb.font
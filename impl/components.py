@@ -0,0 +1,62 @@
+from .records import component_closure
+
+
+class ComponentGraph:
+    """
+    Component references of one font, indexed in both directions.
+
+    Built once per font and updated as glyphs are added or removed, so closure,
+    reverse-reference and missing-component queries never rescan the whole font.
+    """
+
+    def __init__(self, components: dict[str, list[str]] = None):
+        self.components = {}
+        self.references = {}
+        for glyph_name, component_names in (components or {}).items():
+            self.add(glyph_name, component_names)
+
+    @classmethod
+    def from_ufo(cls, ufo_font) -> 'ComponentGraph':
+        graph = cls()
+        for glyph in ufo_font:
+            if glyph.components:
+                graph.add(glyph.name, [component.baseGlyph for component in glyph.components])
+        return graph
+
+    def add(self, glyph_name: str, component_names):
+        """Records the components of a glyph, replacing whatever was recorded for it before."""
+        self.remove(glyph_name)
+        component_names = list(component_names)
+        if not component_names:
+            return
+        self.components[glyph_name] = component_names
+        for component in component_names:
+            self.references.setdefault(component, set()).add(glyph_name)
+
+    def remove(self, glyph_name: str):
+        """Forgets the components of a glyph; references to it from other glyphs are kept."""
+        for component in self.components.pop(glyph_name, ()):
+            referencing = self.references.get(component)
+            if referencing is not None:
+                referencing.discard(glyph_name)
+                if not referencing:
+                    del self.references[component]
+
+    def components_of(self, glyph_name: str) -> list[str]:
+        return self.components.get(glyph_name, [])
+
+    def referencing(self, glyph_name: str) -> set[str]:
+        """Returns the glyphs that use `glyph_name` as a component."""
+        return self.references.get(glyph_name, set())
+
+    def referenced_glyphs(self):
+        """Returns the names of all glyphs used as a component by at least one glyph."""
+        return self.references.keys()
+
+    def closure(self, roots) -> set[str]:
+        """Returns the roots plus every glyph reachable from them through components, at any depth."""
+        return component_closure(roots, self.components)
+
+    def missing(self, present) -> list[str]:
+        """Returns the referenced components that are not in `present`, in the order they were first referenced."""
+        return [glyph_name for glyph_name in self.references if glyph_name not in present]
@@ -0,0 +1,52 @@
+import ufoLib2
+from fontTools.pens.ttGlyphPen import TTGlyphPen
+from ufoLib2.objects.component import Component
+
+# Size of a compiled composite glyph with one untransformed component: header, flags, glyph ID and byte offsets
+COMPONENT_RECORD_SIZE = 16
+
+
+def outline_key(glyph) -> tuple:
+    """
+    Returns the width and contour points of a simple glyph as a hashable value. Point names,
+    identifiers and smooth flags, which do not end up in a TrueType outline, are left out.
+    """
+    return glyph.width, tuple(
+        tuple((point.x, point.y, point.type) for point in contour)
+        for contour in glyph.contours
+    )
+
+
+def compiled_outline_size(glyph) -> int:
+    """Returns the size in bytes of the glyf record of a simple glyph's outline."""
+    pen = TTGlyphPen(None)
+    glyph.draw(pen)
+    return len(pen.glyph().compile(None))
+
+
+def dedupe_ufo_outlines(ufo_font: ufoLib2.Font) -> tuple[int, int]:
+    """
+    Replaces every simple glyph whose outline and width repeat an earlier glyph's with a single
+    component referencing that glyph, so the outline is stored and compiled once. Unicodes and
+    names are kept, so the merged font maps and renders exactly as before.
+
+    Returns:
+        The number of glyphs turned into components and the glyf bytes this saves.
+    """
+    first_glyphs = {}
+    duplicates = []
+    for glyph in ufo_font:
+        if glyph.components or not glyph.contours:
+            continue
+        first_glyph_name = first_glyphs.setdefault(outline_key(glyph), glyph.name)
+        if first_glyph_name != glyph.name:
+            duplicates.append((glyph, first_glyph_name))
+
+    saved_bytes = 0
+    for glyph, first_glyph_name in duplicates:
+        saved_bytes += compiled_outline_size(glyph) - COMPONENT_RECORD_SIZE
+        glyph.contours = []
+        glyph.components.append(Component(baseGlyph=first_glyph_name))
+
+    print(f"Replaced {len(duplicates)} duplicate outlines with components, saving about {saved_bytes} bytes of glyph data")
+    return len(duplicates), saved_bytes
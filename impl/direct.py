@@ -0,0 +1,552 @@
+import io
+import mmap
+import struct
+import sys
+
+from fontTools.fontBuilder import FontBuilder
+from fontTools.ttLib import TTFont, newTable
+from fontTools.ttLib.tables.DefaultTable import DefaultTable
+from fontTools.ttLib.tables._g_l_y_f import Glyph
+
+from .utils import print_progress_bar
+from .records import (
+    MAXP_OUTLINE_FIELDS,
+    SourceFont,
+    remap_component_ids,
+    read_component_ids,
+    component_closure,
+    glyph_bounds,
+    source_glyph_is_empty,
+)
+from .parallel import load_fonts
+from .ranges import RangeIndex
+from .codepoints import CodepointSet
+from .cache import file_sha256
+from .incremental import BuildManifest, write_manifest
+from .profile import profile_stage
+from .mapped import open_mapped_font, table_view
+from .prune import glyphs_to_prune, report_pruned
+
+# Tables carried over to the merged font; everything else references glyph IDs
+# or hinting programs of the base font and is dropped, as in the UFO path.
+TABLES_TO_KEEP = {'head', 'hhea', 'maxp', 'OS/2', 'name', 'cmap', 'post', 'glyf', 'loca', 'hmtx'}
+
+
+def read_source_font(font_path: str, ranges: list[tuple[int, int]], keep_non_bmp: bool, subset_ranges=None) -> SourceFont:
+    """
+    Reads the glyf records of a font without decompiling its outlines.
+
+    Codepoints in `ranges` (and non-BMP codepoints unless `keep_non_bmp` is set) are
+    dropped from the cmap; when `subset_ranges` is given, only the codepoints inside
+    it are kept instead. The glyphs that remain encoded, glyph 0, glyphs the cmap never
+    mapped when `keep_non_bmp` is set, and all of their components are kept, with hinting
+    instructions stripped from the binary records.
+    """
+    with profile_stage('read_source_font', font=font_path) as stage:
+        source = _read_source_font(font_path, ranges, keep_non_bmp, subset_ranges)
+        stage.glyphs = len(source.glyph_order)
+    return source
+
+
+def select_source_glyphs(glyph_order: list[str], cmap: dict[int, str], components: dict[str, list[str]],
+                         ranges: list[tuple[int, int]], keep_non_bmp: bool, subset_ranges=None) -> tuple[dict[str, list[int]], set[str], set[str]]:
+    """
+    Applies the range and non-BMP filters to a cmap, or keeps only the codepoints in
+    `subset_ranges` when given; returns the remaining unicodes per glyph, the glyphs the
+    cmap never mapped that `keep_non_bmp` keeps, and all the glyphs to keep.
+    """
+    if subset_ranges is not None:
+        codepoints = RangeIndex(subset_ranges).select(cmap)
+    else:
+        codepoints = list(cmap) if keep_non_bmp else [codepoint for codepoint in cmap if codepoint <= 0xFFFF]
+        codepoints = RangeIndex(ranges).exclude(codepoints)
+    unicodes = {}
+    for codepoint in codepoints:
+        unicodes.setdefault(cmap[codepoint], []).append(codepoint)
+
+    roots = set(unicodes)
+    roots.add(glyph_order[0])
+    keep_unencoded = keep_non_bmp and subset_ranges is None
+    encoded = set(cmap.values())
+    if keep_unencoded:
+        # As in the UFO path, a glyph the cmap never mapped is kept unless it is a component
+        # only of glyphs the filters drop; glyphs the filters emptied are not among them
+        referenced = {name for names in components.values() for name in names}
+        roots.update(glyph_name for glyph_name in glyph_order if glyph_name not in encoded and glyph_name not in referenced)
+    kept = component_closure(roots, components)
+    unencoded = {glyph_name for glyph_name in kept if glyph_name not in encoded} if keep_unencoded else set()
+    return unicodes, unencoded, kept
+
+
+def require_glyf(tt_font: TTFont, font_path: str):
+    if 'glyf' not in tt_font:
+        print(f"Error: '{font_path}' has no glyf table; the direct merge only supports TrueType outlines.")
+        sys.exit(1)
+
+
+def _read_source_font(font_path: str, ranges: list[tuple[int, int]], keep_non_bmp: bool, subset_ranges=None) -> SourceFont:
+    with open_mapped_font(font_path) as tt_font:
+        require_glyf(tt_font, font_path)
+        tt_glyf_table = tt_font['glyf']
+        tt_hmtx_table = tt_font['hmtx']
+        glyph_order = tt_font.getGlyphOrder()
+
+        components = {}
+        for glyph_name in glyph_order:
+            glyph = tt_glyf_table.glyphs[glyph_name]
+            component_names = glyph.getComponentNames(tt_glyf_table)
+            if component_names:
+                components[glyph_name] = component_names
+
+        unicodes, unencoded, kept = select_source_glyphs(glyph_order, tt_font.getBestCmap(), components, ranges, keep_non_bmp, subset_ranges)
+
+        source = SourceFont(path=font_path)
+        for glyph_name in glyph_order:
+            if glyph_name not in kept:
+                continue
+            glyph = tt_glyf_table.glyphs[glyph_name]
+            glyph.trim(remove_hinting=True)
+            source.glyph_order.append(glyph_name)
+            source.glyph_data[glyph_name] = bytes(getattr(glyph, 'data', b''))
+            source.metrics[glyph_name] = tt_hmtx_table[glyph_name]
+            if glyph_name in components:
+                source.components[glyph_name] = components[glyph_name]
+            if glyph_name in unicodes:
+                source.unicodes[glyph_name] = sorted(unicodes[glyph_name])
+            elif glyph_name in unencoded:
+                source.unencoded.append(glyph_name)
+
+        tt_maxp_table = tt_font['maxp']
+        source.maxp = {name: getattr(tt_maxp_table, name, 0) for name in MAXP_OUTLINE_FIELDS}
+    return source
+
+
+def read_source_index(font_path: str, ranges: list[tuple[int, int]], keep_non_bmp: bool, subset_ranges=None) -> SourceFont:
+    """
+    Same selection as `read_source_font`, but instead of copying the kept glyph records
+    it notes where each one lies in the file, for `MappedGlyphRecords` to read at write time.
+
+    The glyf table is memory-mapped and only the headers and component records of
+    composite glyphs are parsed, so no outline data is held in memory.
+    """
+    with profile_stage('read_source_index', font=font_path) as stage, open_mapped_font(font_path) as tt_font:
+        require_glyf(tt_font, font_path)
+        if tt_font.reader.flavor is not None:
+            print(f"Error: '{font_path}' is a compressed {tt_font.reader.flavor} font; --low-memory needs uncompressed inputs.")
+            sys.exit(1)
+        glyph_order = tt_font.getGlyphOrder()
+        locations = tt_font['loca'].locations
+        glyf_offset = tt_font.reader.tables['glyf'].offset
+
+        components = {}
+        glyf_data = table_view(tt_font, 'glyf')
+        for glyph_id, glyph_name in enumerate(glyph_order):
+            start = locations[glyph_id]
+            if locations[glyph_id + 1] > start and struct.unpack_from(">h", glyf_data, start)[0] < 0:
+                components[glyph_name] = [glyph_order[component_id] for component_id in read_component_ids(glyf_data, start)]
+        del glyf_data  # Release the view before the mapping closes
+
+        unicodes, unencoded, kept = select_source_glyphs(glyph_order, tt_font.getBestCmap(), components, ranges, keep_non_bmp, subset_ranges)
+
+        tt_hmtx_table = tt_font['hmtx']
+        source = SourceFont(path=font_path)
+        for glyph_id, glyph_name in enumerate(glyph_order):
+            if glyph_name not in kept:
+                continue
+            source.glyph_order.append(glyph_name)
+            source.glyph_locations[glyph_name] = (glyf_offset + locations[glyph_id], glyf_offset + locations[glyph_id + 1])
+            source.metrics[glyph_name] = tt_hmtx_table[glyph_name]
+            if glyph_name in components:
+                source.components[glyph_name] = components[glyph_name]
+            if glyph_name in unicodes:
+                source.unicodes[glyph_name] = sorted(unicodes[glyph_name])
+            elif glyph_name in unencoded:
+                source.unencoded.append(glyph_name)
+
+        tt_maxp_table = tt_font['maxp']
+        source.maxp = {name: getattr(tt_maxp_table, name, 0) for name in MAXP_OUTLINE_FIELDS}
+        stage.glyphs = len(source.glyph_order)
+    return source
+
+
+class MappedGlyphRecords:
+    """Reads glyph records located by `read_source_index` from memory-mapped input files, stripping hinting."""
+
+    def __init__(self):
+        self._files = {}
+
+    def read(self, source: SourceFont, glyph_name: str) -> bytes:
+        if glyph_name in source.glyph_data:
+            return source.glyph_data[glyph_name]  # Taken from a previous build's output
+        font_data = self._files.get(source.path)
+        if font_data is None:
+            with open(source.path, 'rb') as f:
+                font_data = self._files[source.path] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        start, end = source.glyph_locations[glyph_name]
+        if end <= start:
+            return b''
+        glyph = Glyph(font_data[start:end])
+        glyph.trim(remove_hinting=True)
+        return bytes(getattr(glyph, 'data', b''))
+
+    def close(self):
+        for font_data in self._files.values():
+            font_data.close()
+        self._files = {}
+
+
+def unique_glyph_name(glyph_name: str, existing_glyphs) -> str:
+    """Returns `glyph_name`, suffixed with `.1`, `.2`, ... if it is already taken."""
+    if glyph_name not in existing_glyphs:
+        return glyph_name
+    suffix = 1
+    while f"{glyph_name}.{suffix}" in existing_glyphs:
+        suffix += 1
+    return f"{glyph_name}.{suffix}"
+
+
+class MergedGlyphs:
+    """Glyph records selected for the merged font, in output glyph order."""
+
+    def __init__(self, base: SourceFont, keep_unencoded=False):
+        self.keep_unencoded = keep_unencoded
+        self.glyph_order = []
+        self.records = {}  # output name -> (source, source glyph name)
+        self.renames = {}  # (id(source), source glyph name) -> output name
+        self.cmap = {}
+        self.covered = CodepointSet()
+        self.maxp = dict(base.maxp)
+
+        for glyph_name in base.glyph_order:
+            self._add(base, glyph_name, glyph_name)
+            for codepoint in base.unicodes.get(glyph_name, ()):
+                self.cmap[codepoint] = glyph_name
+        self.covered.update(self.cmap)
+
+    def _add(self, source: SourceFont, glyph_name: str, output_name: str):
+        self.glyph_order.append(output_name)
+        self.records[output_name] = (source, glyph_name)
+        self.renames[(id(source), glyph_name)] = output_name
+
+    def merge(self, fallback: SourceFont):
+        """Adds the fallback glyphs whose codepoints are not yet covered, plus their components."""
+        total_glyphs = len(fallback.glyph_order)
+        print(f"Merging {total_glyphs} glyphs...")
+
+        notdef = fallback.glyph_order[0]
+        colliding = CodepointSet(codepoint for codepoints in fallback.unicodes.values() for codepoint in codepoints) & self.covered
+        unencoded = set(fallback.unencoded) if self.keep_unencoded else set()
+        winners = []
+        for i, glyph_name in enumerate(fallback.glyph_order, start=1):
+            glyph_unicodes = fallback.unicodes.get(glyph_name)
+            if glyph_unicodes:
+                if not any(codepoint in colliding for codepoint in glyph_unicodes):
+                    winners.append(glyph_name)
+            elif glyph_name in unencoded and glyph_name != notdef and glyph_name not in self.records:
+                # As in `merge_ufo_fonts`, an unencoded glyph whose name is taken is a duplicate
+                winners.append(glyph_name)
+
+            if i % 100 == 0 or i == total_glyphs:
+                print_progress_bar(i, total_glyphs)
+
+        print()  # Move to a new line after progress bar completes
+
+        added = component_closure(winners, fallback.components)
+        for glyph_name in fallback.glyph_order:
+            if glyph_name in added:
+                self._add(fallback, glyph_name, unique_glyph_name(glyph_name, self.records))
+
+        for glyph_name in winners:
+            for codepoint in fallback.unicodes.get(glyph_name, ()):
+                self.cmap[codepoint] = self.renames[(id(fallback), glyph_name)]
+                self.covered.add(codepoint)
+
+        for name, value in fallback.maxp.items():
+            self.maxp[name] = max(self.maxp.get(name, 0), value)
+
+    def prune(self, remove_empty=False, remove_dangling=False):
+        """Removes empty and/or dangling glyphs, as decided by `glyphs_to_prune`, with their cmap entries."""
+        glyph_unicodes = {}
+        for codepoint, glyph_name in self.cmap.items():
+            glyph_unicodes.setdefault(glyph_name, []).append(codepoint)
+        components = {}
+        empty_glyphs = set()
+        for glyph_name, (source, source_name) in self.records.items():
+            if source_name in source.components:
+                components[glyph_name] = [self.renames[(id(source), component)] for component in source.components[source_name]]
+            elif remove_empty and source_glyph_is_empty(source, source_name):
+                empty_glyphs.add(glyph_name)
+
+        removed = glyphs_to_prune(self.glyph_order, glyph_unicodes, components, self.glyph_order[0], empty_glyphs, remove_dangling)
+        if removed:
+            # Only unreachable glyphs are removed, so no kept composite refers to them
+            removed_set = set(removed)
+            self.glyph_order = [glyph_name for glyph_name in self.glyph_order if glyph_name not in removed_set]
+            for glyph_name in removed:
+                del self.records[glyph_name]
+            self.cmap = {codepoint: glyph_name for codepoint, glyph_name in self.cmap.items() if glyph_name not in removed_set}
+        report_pruned(removed, empty_glyphs)
+
+    def metrics(self) -> dict[str, tuple[int, int]]:
+        """Returns the (advance width, left side bearing) of every output glyph."""
+        return {glyph_name: source.metrics[source_name] for glyph_name, (source, source_name) in self.records.items()}
+
+    def compile_glyph_data(self) -> dict[str, bytes]:
+        """Returns the binary glyf records keyed by output name, with component IDs remapped."""
+        return dict(self.iter_glyph_data(lambda source, glyph_name: source.glyph_data[glyph_name]))
+
+    def iter_glyph_data(self, read_record):
+        """
+        Yields `(output name, binary glyf record)` in output glyph order, with component IDs
+        remapped; `read_record(source, glyph name)` returns the record as read from its input.
+        """
+        glyph_ids = {glyph_name: glyph_id for glyph_id, glyph_name in enumerate(self.glyph_order)}
+        for glyph_name in self.glyph_order:
+            source, source_name = self.records[glyph_name]
+            data = read_record(source, source_name)
+            if source_name in source.components:
+                component_ids = [
+                    glyph_ids[self.renames[(id(source), component)]]
+                    for component in source.components[source_name]
+                ]
+                data = remap_component_ids(data, component_ids)
+            yield glyph_name, data
+
+
+def prepare_merged_font(base_path: str, merged: MergedGlyphs) -> TTFont:
+    """Opens the base font, drops the tables that are not carried over and rebuilds hmtx/cmap/post for the merged glyphs."""
+    tt_font = TTFont(base_path, lazy=True)
+    # glyf and loca are replaced by the caller, so the base outlines are never read
+    for tag in TABLES_TO_KEEP - {'glyf', 'loca'}:
+        if tag in tt_font:
+            tt_font[tag]  # decompile before the glyph order changes
+    for tag in list(tt_font.keys()):
+        if tag != 'GlyphOrder' and tag not in TABLES_TO_KEEP:
+            del tt_font[tag]
+    # Every table left is decompiled; let go of the base file, which may also be the output.
+    # The empty glyf table, replaced by the caller, keeps the font marked as TrueType
+    tt_font.reader.close()
+    tt_font.reader = None
+    tt_font.lazy = False
+    tt_font['glyf'] = newTable('glyf')
+
+    glyph_order = merged.glyph_order
+    if len(glyph_order) > 0xFFFF:
+        print(f"Error: The merged font would have {len(glyph_order)} glyphs; the limit is 65535.")
+        sys.exit(1)
+
+    tt_font.setGlyphOrder(glyph_order)
+    builder = FontBuilder(font=tt_font)
+    builder.setupHorizontalMetrics(merged.metrics())
+    builder.setupCharacterMap(merged.cmap, allowFallback=True)
+
+    tt_post_table = tt_font['post']
+    tt_post_table.formatType = 2.0
+    tt_post_table.extraNames = []
+    tt_post_table.mapping = {}
+    return tt_font
+
+
+def update_font_metrics(tt_font: TTFont, merged: MergedGlyphs, bounds: list):
+    """
+    Updates head/hhea/maxp/OS/2 of the merged font; `bounds` holds the header bounds
+    of every glyph record in glyph order, or None for empty glyphs.
+    """
+    # Glyph records are written as-is, so the bounding boxes and maxima that
+    # fontTools would recompute from decompiled outlines are derived here instead.
+    metrics = tt_font['hmtx'].metrics
+    font_bounds = None
+    advance_width_max = 0
+    min_lsb = min_rsb = x_max_extent = None
+    for glyph_name, glyph_bounds_or_none in zip(merged.glyph_order, bounds):
+        advance_width, lsb = metrics[glyph_name]
+        advance_width_max = max(advance_width_max, advance_width)
+        if glyph_bounds_or_none is None:
+            continue
+        x_min, y_min, x_max, y_max = glyph_bounds_or_none
+        extent = lsb + (x_max - x_min)
+        min_lsb = lsb if min_lsb is None else min(min_lsb, lsb)
+        min_rsb = advance_width - extent if min_rsb is None else min(min_rsb, advance_width - extent)
+        x_max_extent = extent if x_max_extent is None else max(x_max_extent, extent)
+        if font_bounds is None:
+            font_bounds = list(glyph_bounds_or_none)
+        else:
+            font_bounds = [min(font_bounds[0], x_min), min(font_bounds[1], y_min), max(font_bounds[2], x_max), max(font_bounds[3], y_max)]
+
+    tt_head_table = tt_font['head']
+    if font_bounds is not None:
+        tt_head_table.xMin, tt_head_table.yMin, tt_head_table.xMax, tt_head_table.yMax = font_bounds
+
+    tt_hhea_table = tt_font['hhea']
+    tt_hhea_table.advanceWidthMax = advance_width_max
+    tt_hhea_table.minLeftSideBearing = min_lsb or 0
+    tt_hhea_table.minRightSideBearing = min_rsb or 0
+    tt_hhea_table.xMaxExtent = x_max_extent or 0
+
+    tt_maxp_table = tt_font['maxp']
+    tt_maxp_table.numGlyphs = len(merged.glyph_order)
+    if tt_maxp_table.tableVersion == 0x00010000:
+        for name, value in merged.maxp.items():
+            setattr(tt_maxp_table, name, value)
+        # Hinting is stripped from every glyph record
+        tt_maxp_table.maxZones = 1
+        tt_maxp_table.maxTwilightPoints = 0
+        tt_maxp_table.maxStorage = 0
+        tt_maxp_table.maxFunctionDefs = 0
+        tt_maxp_table.maxInstructionDefs = 0
+        tt_maxp_table.maxStackElements = 0
+        tt_maxp_table.maxSizeOfInstructions = 0
+
+    if 'OS/2' in tt_font:
+        tt_os2_table = tt_font['OS/2']
+        tt_os2_table.updateFirstAndLastCharIndex(tt_font)
+        tt_os2_table.recalcUnicodeRanges(tt_font)
+        tt_os2_table.recalcAvgCharWidth(tt_font)
+
+    tt_font.recalcBBoxes = False
+
+
+def build_merged_font(base_path: str, merged: MergedGlyphs) -> TTFont:
+    """Rebuilds glyf/loca/hmtx/cmap/post in the base font and updates head/hhea/maxp/OS/2 in place."""
+    tt_font = prepare_merged_font(base_path, merged)
+    glyph_data = merged.compile_glyph_data()
+    builder = FontBuilder(font=tt_font)
+    builder.setupGlyf({glyph_name: Glyph(glyph_data[glyph_name]) for glyph_name in merged.glyph_order}, calcGlyphBounds=False, validateGlyphFormat=False)
+    update_font_metrics(tt_font, merged, [glyph_bounds(glyph_data[glyph_name]) for glyph_name in merged.glyph_order])
+    return tt_font
+
+
+def build_streamed_font(base_path: str, merged: MergedGlyphs) -> TTFont:
+    """
+    Same as `build_merged_font` for sources read by `read_source_index`: the output glyf
+    table is assembled record by record straight from the memory-mapped inputs, so the
+    only outline data in memory is the merged font's own.
+    """
+    tt_font = prepare_merged_font(base_path, merged)
+    glyf_file = io.BytesIO()
+    locations = []
+    sizes = []
+    bounds = []
+    records = MappedGlyphRecords()
+    try:
+        for _, data in merged.iter_glyph_data(records.read):
+            locations.append(glyf_file.tell())
+            glyf_file.write(data)
+            if len(data) % 2:
+                glyf_file.write(b"\0")
+            sizes.append(len(data))
+            bounds.append(glyph_bounds(data))
+    finally:
+        records.close()
+    locations.append(glyf_file.tell())
+
+    # Same layout as fontTools' glyf compiler: odd-sized records are padded only when
+    # that lets a small glyf table use short loca offsets, so past that size the
+    # padding is squeezed out again, in place
+    if locations[-1] >= 0x20000 and locations[-1] > sum(sizes):
+        with glyf_file.getbuffer() as glyf_view:
+            offset = 0
+            for i, size in enumerate(sizes):
+                start = locations[i]
+                glyf_view[offset:offset + size] = glyf_view[start:start + size]
+                locations[i] = offset
+                offset += size
+        locations[-1] = offset
+        glyf_file.truncate(offset)
+
+    tt_glyf_table = DefaultTable('glyf')
+    # getvalue() hands over the buffer itself rather than a copy
+    tt_glyf_table.data = glyf_file.getvalue() or b"\0"
+    del glyf_file
+    tt_font['glyf'] = tt_glyf_table
+    tt_loca_table = newTable('loca')
+    tt_loca_table.set(locations)
+    tt_font['loca'] = tt_loca_table
+
+    update_font_metrics(tt_font, merged, bounds)
+    return tt_font
+
+
+def merge_fonts_direct(font_paths, output: str, ranges: list[tuple[int, int]], keep_non_bmp=False, jobs=1, cache=None,
+                       incremental=False, low_memory=False, subset_ranges=None, remove_empty_glyphs=False, remove_dangling_glyphs=False):
+    """
+    Merges fonts at the glyf/hmtx/cmap level, copying glyph records as compiled blobs.
+
+    With `incremental`, a manifest is kept next to the output. Inputs that are unchanged
+    since the previous build are not read again: their filtered cmaps come from the
+    manifest and the glyph records they contributed are copied from the previous output.
+
+    With `low_memory`, inputs are indexed rather than read, and the glyph records that
+    survive the merge are copied from memory-mapped inputs while the output is built.
+
+    With `subset_ranges`, only glyphs for the codepoints in those ranges, and their
+    components, are taken from any input. `remove_empty_glyphs` and `remove_dangling_glyphs`
+    prune the merged glyph set before the output is built.
+    """
+    base_font_path = font_paths[0]
+
+    options = {
+        'ranges': [list(r) for r in ranges],
+        'keep_non_bmp': keep_non_bmp,
+        'subset_ranges': None if subset_ranges is None else [list(r) for r in subset_ranges],
+    }
+    manifest = BuildManifest.load(output, options) if incremental else None
+    hashes = [file_sha256(font_path) for font_path in font_paths] if incremental else []
+    preloaded = {}
+    if manifest is not None:
+        for i, (font_path, sha256) in enumerate(zip(font_paths, hashes)):
+            if manifest.can_reuse(sha256):
+                preloaded[i] = manifest.reuse_source(font_path, sha256)
+
+    merged = None
+    sources = []
+    loader = read_source_index if low_memory else read_source_font
+    for font_path, source in load_fonts(font_paths, loader, ranges, keep_non_bmp, subset_ranges, jobs=jobs, cache=cache, preloaded=preloaded):
+        sources.append(source)
+        if merged is None:
+            merged = MergedGlyphs(source, keep_unencoded=keep_non_bmp)
+        else:
+            with profile_stage('merge glyphs', font=font_path) as stage:
+                stage.glyphs = len(source.glyph_order)
+                merged.merge(source)
+
+    # A reused input may now contribute glyphs that were not part of the previous output
+    reused_sources = {id(source) for source in preloaded.values()}
+    for source in preloaded.values():
+        if any(record_source is source and source_name not in source.glyph_data for record_source, source_name in merged.records.values()):
+            print(f"Reading glyphs newly taken from: {source.path}")
+            full_source = loader(source.path, ranges, keep_non_bmp, subset_ranges)
+            source.glyph_data = full_source.glyph_data
+            source.glyph_locations = full_source.glyph_locations
+            source.metrics = full_source.metrics
+    if manifest is not None:
+        reused_glyphs = sum(1 for source, _ in merged.records.values() if id(source) in reused_sources)
+        print(f"Took {reused_glyphs} of {len(merged.records)} glyphs from unchanged inputs")
+        manifest.close()
+
+    if remove_empty_glyphs or remove_dangling_glyphs:
+        with profile_stage('prune glyphs') as stage:
+            stage.glyphs = len(merged.glyph_order)
+            merged.prune(remove_empty_glyphs, remove_dangling_glyphs)
+
+    glyphs_with_codepoints = len(set(merged.cmap.values()))
+    total_glyphs = len(merged.glyph_order)
+
+    print(f"Number of glyphs directly addressable by codepoint: {glyphs_with_codepoints}")
+    print(f"Number of glyphs only addressable by name: {total_glyphs - glyphs_with_codepoints}")
+    print(f"Total number of glyphs: {total_glyphs}")
+
+    print("Building TTF tables...")
+    with profile_stage('build_merged_font') as stage:
+        stage.glyphs = total_glyphs
+        tt_font = build_streamed_font(base_font_path, merged) if low_memory else build_merged_font(base_font_path, merged)
+    print(f"Writing merged font to: {output}")
+    with profile_stage('save'):
+        tt_font.save(output)
+
+    if incremental:
+        with profile_stage('write_manifest'):
+            write_manifest(output, options, sources, hashes, merged)
+        print(f"Writing build manifest to: {output}.manifest.json")
+
+    print("Mission Accomplished!")
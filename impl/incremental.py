@@ -0,0 +1,116 @@
+import json
+import os
+from pathlib import Path
+
+from fontTools.ttLib import TTFont
+
+from .cache import file_sha256
+from .records import SourceFont
+
+MANIFEST_VERSION = 2
+
+
+def manifest_path(output: str) -> Path:
+    """Returns the path of the build manifest written next to a merged font."""
+    return Path(f"{output}.manifest.json")
+
+
+class BuildManifest:
+    """
+    Record of a previous direct merge: its options, the filtered cmap and component
+    data of every input keyed by SHA-256, and the provenance of every output glyph.
+
+    Inputs whose hash is recorded can be replayed through the merge without reading
+    them again; their glyph records are taken from the previous output instead.
+    """
+
+    def __init__(self, data: dict, output: str):
+        self.data = data
+        self.output = output
+        self._previous_font = None
+
+    @classmethod
+    def load(cls, output: str, options: dict):
+        """Returns the manifest of the previous build, or None if it cannot be reused."""
+        path = manifest_path(output)
+        if not path.exists() or not Path(output).exists():
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if data.get('version') != MANIFEST_VERSION or data.get('options') != options:
+            return None
+        if data.get('output_sha256') != file_sha256(output):
+            print(f"Output {output} changed since the last build; rebuilding from scratch.")
+            return None
+        return cls(data, output)
+
+    def can_reuse(self, sha256: str) -> bool:
+        return sha256 in self.data['sources']
+
+    def reuse_source(self, font_path: str, sha256: str) -> SourceFont:
+        """
+        Rebuilds the filtered glyph selection of an unchanged input from the manifest,
+        with the glyph records it contributed last time read back from the previous output.
+        """
+        entry = self.data['sources'][sha256]
+        source = SourceFont(
+            path=font_path,
+            glyph_order=entry['glyph_order'],
+            components=entry['components'],
+            unicodes=entry['unicodes'],
+            unencoded=entry['unencoded'],
+            maxp=entry['maxp'],
+        )
+
+        if self._previous_font is None:
+            self._previous_font = TTFont(self.output)
+        tt_glyf_table = self._previous_font['glyf']
+        tt_hmtx_table = self._previous_font['hmtx']
+        for output_name, (source_sha256, glyph_name) in self.data['glyphs'].items():
+            if source_sha256 != sha256:
+                continue
+            glyph = tt_glyf_table.glyphs[output_name]
+            glyph.trim()
+            source.glyph_data[glyph_name] = bytes(getattr(glyph, 'data', b''))
+            source.metrics[glyph_name] = tt_hmtx_table[output_name]
+        return source
+
+    def close(self):
+        if self._previous_font is not None:
+            self._previous_font.close()
+            self._previous_font = None
+
+
+def write_manifest(output: str, options: dict, sources: list[SourceFont], hashes: list[str], merged):
+    """Writes the manifest describing the merged font that was just saved to `output`."""
+    source_hashes = {id(source): sha256 for source, sha256 in zip(sources, hashes)}
+    data = {
+        'version': MANIFEST_VERSION,
+        'options': options,
+        'output_sha256': file_sha256(output),
+        'inputs': [{'path': source.path, 'sha256': sha256} for source, sha256 in zip(sources, hashes)],
+        'sources': {
+            sha256: {
+                'glyph_order': source.glyph_order,
+                'unicodes': source.unicodes,
+                'components': source.components,
+                'unencoded': source.unencoded,
+                'maxp': source.maxp,
+            }
+            for source, sha256 in zip(sources, hashes)
+        },
+        'glyphs': {
+            output_name: [source_hashes[id(source)], glyph_name]
+            for output_name, (source, glyph_name) in merged.records.items()
+        },
+    }
+
+    path = manifest_path(output)
+    temp_path = path.with_name(path.name + '.tmp')
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    os.replace(temp_path, path)
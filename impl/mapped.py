@@ -0,0 +1,40 @@
+import contextlib
+import mmap
+
+from fontTools.ttLib import TTFont
+
+
+@contextlib.contextmanager
+def open_mapped_font(font_path: str):
+    """
+    Opens a font for reading over a read-only memory map of its file.
+
+    `TTFont(path)` copies the whole file into a private buffer; here nothing is read up
+    front, and a table is only copied out of the mapping when it is first decompiled.
+    Tables that are never decompiled, such as a glyf table read through `table_view`,
+    are not copied at all, so processes reading the same font share those pages in the
+    page cache. The font must not be used after the block.
+    """
+    with open(font_path, 'rb') as f:
+        font_data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    tt_font = TTFont(font_data, lazy=True)
+    tt_font.mapped_data = font_data
+    try:
+        yield tt_font
+    finally:
+        try:
+            tt_font.close()  # Closes the mapping too
+        except BufferError:
+            pass  # A table view is still referenced; the mapping is released with it
+
+
+def table_view(tt_font: TTFont, tag: str):
+    """
+    Returns the raw data of a table as a zero-copy view of the mapped file when the font
+    was opened by `open_mapped_font` and the table is stored uncompressed; otherwise a copy.
+    """
+    font_data = getattr(tt_font, 'mapped_data', None)
+    entry = tt_font.reader.tables.get(tag) if tt_font.reader is not None else None
+    if font_data is None or entry is None or tt_font.reader.flavor is not None:
+        return tt_font.getTableData(tag)
+    return memoryview(font_data)[entry.offset:entry.offset + entry.length]
@@ -1,69 +1,50 @@
-from fontTools.ttLib import TTFont
 import ufoLib2
-from ufo2ft import compileTTF
 from pathlib import Path
 import shutil
-from collections import defaultdict
 
 from .utils import (
     print_progress_bar,
     convert_ttfont_to_ufo,
+    pack_ufo_font,
+    unpack_ufo_font,
+    LazyGlyph,
 )
+from .direct import merge_fonts_direct, read_source_font, read_source_index
+from .parallel import load_fonts, resolve_jobs
+from .cache import FontCache, DEFAULT_CACHE_SIZE_MB
+from .ranges import RangeIndex
+from .codepoints import CodepointSet
+from .plan import GlyphPlan, plan_ufo_merge
+from .subset import count_codepoints
+from .profile import profile_stage
+from .components import ComponentGraph
+from .mapped import open_mapped_font
+from .profiles import codepoint_ranges_to_remove
+from .prune import glyphs_to_prune, report_pruned
+from .dedupe import dedupe_ufo_outlines
+
+
+def merge_ufo_fonts(base_font: ufoLib2.Font, merge_font: ufoLib2.Font, component_graph: ComponentGraph = None):
+    """
+    Merges the second UFO font into the base font, avoiding duplicates and handling composites.
+
+    `component_graph` describes the base font and is kept up to date as glyphs are added,
+    so merging many fallbacks builds it only once; it is built here if not given.
+    """
+    if component_graph is None:
+        component_graph = ComponentGraph.from_ufo(base_font)
 
-codepoint_ranges_to_remove = [
-    (0x0250, 0x02AF),  # IPA Extensions
-    (0x0300, 0x036F),  # Combining Diacritical Marks
-    (0x0500, 0x052F),  # Cyrillic Supplement
-    (0x0900, 0x097F),  # Devanagari
-    (0x10A0, 0x10FF),  # Georgian
-    (0x1100, 0x11FF),  # Hangul Jamo
-    (0x1AB0, 0x1AFF),  # Combining Diacritical Marks Extended
-    (0x1C80, 0x1C8F),  # Cyrillic Extended C
-    (0x1D00, 0x1D7F),  # Phonetic Extensions
-    (0x1D80, 0x1DBF),  # Phonetic Extensions Supplement
-    (0x1DC0, 0x1DFF),  # Combining Diacritical Marks Supplement
-    (0x1E00, 0x1EFF),  # Latin Extended Additional
-    (0x1F00, 0x1FFF),  # Greek Extended
-    (0x2400, 0x243F),  # Control Pictures
-    (0x2700, 0x27BF),  # Dingbats
-    (0x2900, 0x297F),  # Supplemental Arrows B
-    (0x2980, 0x29FF),  # Miscellaneous Mathematical Symbols B
-    (0x2B00, 0x2BFF),  # Miscellaneous Symbols and Arrows
-    (0x2C60, 0x2C7F),  # Latin Extended C
-    (0x2DE0, 0x2DFF),  # Cyrillic Extended A
-    (0x2E00, 0x2E7F),  # Supplemental Punctuation
-    (0x2E80, 0x2EFF),  # CJK Radicals Supplement
-    (0x2F00, 0x2FDF),  # Kangxi Radicals
-    (0x2FF0, 0x2FFF),  # Ideographic Description Characters
-    (0x3190, 0x319F),  # Kanbun
-    (0x31A0, 0x31BF),  # Bopomofo Extended
-    (0x31C0, 0x31EF),  # CJK Strokes
-    (0x31F0, 0x31FF),  # Katakana Phonetic Extensions
-    (0xA700, 0xA71F),  # Modifier Tone Letters
-    (0xA720, 0xA7FF),  # Latin Extended D
-    (0xA8E0, 0xA8FF),  # Devanagari Extended
-    (0xA900, 0xA92F),  # Kayah Li
-    (0xA960, 0xA97F),  # Hangul Jamo Extended A
-    (0xAB30, 0xAB6F),  # Latin Extended E
-    (0xD7B0, 0xD7FF),  # Hangul Jamo Extended B
-    (0xFB00, 0xFB4F),  # Alphabetic Presentation Forms
-    (0xFE00, 0xFE0F),  # Variation Selectors
-    (0xFE10, 0xFE1F),  # Vertical Forms
-    (0xFE20, 0xFE2F),  # Combining Half Marks
-    (0xFE70, 0xFEFF),  # Arabic Presentation Forms B
-    (0xFFF0, 0xFFFF),  # Specials
-]
-
-
-def merge_ufo_fonts(base_font: ufoLib2.Font, merge_font: ufoLib2.Font):
-    """Merges the second UFO font into the base font, avoiding duplicates and handling composites."""
     # Track existing glyphs in the base font
     existing_glyphs = set(base_font.keys())
 
-    referenced_unicodes = set()
+    referenced_unicodes = CodepointSet()
     for glyph in base_font:
         referenced_unicodes.update(glyph.unicodes)
 
+    # Every codepoint maps to a single glyph within one font, so the collisions
+    # can be found up front with one bitmap intersection.
+    colliding_unicodes = CodepointSet(codepoint for glyph in merge_font for codepoint in glyph.unicodes) & referenced_unicodes
+
     # Get total number of glyphs for progress tracking
     total_glyphs = len(merge_font.keys())
     print(f"Merging {total_glyphs} glyphs...")
@@ -77,10 +58,11 @@ def merge_ufo_fonts(base_font: ufoLib2.Font, merge_font: ufoLib2.Font):
             continue
 
         # Check for Unicode collisions
-        if any(codepoint in referenced_unicodes for codepoint in merge_glyph.unicodes):
+        if any(codepoint in colliding_unicodes for codepoint in merge_glyph.unicodes):
             continue
 
         base_font.addGlyph(merge_glyph)
+        component_graph.add(glyph_name, [component.baseGlyph for component in merge_glyph.components])
         existing_glyphs.add(glyph_name)
         referenced_unicodes.update(merge_glyph.unicodes)
 
@@ -90,59 +72,46 @@ def merge_ufo_fonts(base_font: ufoLib2.Font, merge_font: ufoLib2.Font):
 
     print()  # Move to a new line after progress bar completes
 
-    # Ensure composite glyphs reference existing base glyphs
-    total_composites = len(base_font.keys())
-    print(f"Fixing composite glyphs ({total_composites} glyphs)...")
-
-    for i, glyph_name in enumerate(base_font.keys(), start=1):
-        glyph = base_font[glyph_name]
-        for component in glyph.components:
-            base_glyph_name = component.baseGlyph
-            if base_glyph_name not in base_font:
-                if base_glyph_name in merge_font:
-                    base_font.addGlyph(merge_font[base_glyph_name])
-
-        # Print progress every 10 glyphs or at the end
-        if i % 1000 == 0 or i == total_composites:
-            print_progress_bar(i, total_composites)
-
-    print()  # Move to a new line after progress bar completes
-
-
-def is_codepoint_in_ranges(codepoint: int, ranges: list[tuple[int, int]]) -> bool:
-    """Check if a codepoint falls within any of the specified ranges."""
-    return any(start <= codepoint <= end for start, end in ranges)
-
-
-def build_component_reference_map(ufo_font: ufoLib2.Font) -> defaultdict[str, list[str]]:
-    """Builds a map of glyphs referenced by composite glyphs."""
-    component_references = defaultdict(list)
-    for glyph_name in ufo_font.keys():
-        glyph = ufo_font[glyph_name]
-        for component in glyph.components:
-            component_references[component.baseGlyph].append(glyph_name)
-    return component_references
+    # Pull in the components that glyphs in the base font reference but it lacks,
+    # following nested composites down to their simple glyphs
+    missing_components = component_graph.missing(base_font)
+    print(f"Resolving {len(missing_components)} missing components...")
+    resolved = 0
+    while missing_components:
+        base_glyph_name = missing_components.pop()
+        if base_glyph_name in base_font or base_glyph_name not in merge_font:
+            continue
+        merge_glyph = merge_font[base_glyph_name]
+        # The component may have lost a unicode collision; it only contributes its outline then
+        merge_glyph.unicodes = [codepoint for codepoint in merge_glyph.unicodes if codepoint not in referenced_unicodes]
+        referenced_unicodes.update(merge_glyph.unicodes)
+        base_font.addGlyph(merge_glyph)
+        component_graph.add(base_glyph_name, [component.baseGlyph for component in merge_glyph.components])
+        missing_components.extend(component_graph.components_of(base_glyph_name))
+        resolved += 1
+    print(f"Added {resolved} component glyphs from the merge font")
 
 
 def remove_glyphs_in_ranges(ufo_font: ufoLib2.Font, ranges: list[tuple[int, int]]):
     # First Pass: Collect all glyphs that need to be removed based on codepoint ranges
     total_glyphs = len(ufo_font)
     glyphs_to_remove = set()
+    range_index = ranges if isinstance(ranges, RangeIndex) else RangeIndex(ranges)
 
     print(f"Analyzing {total_glyphs} glyphs for removal...")
     for i, glyph_name in enumerate(list(ufo_font.keys()), start=1):
         glyph = ufo_font[glyph_name]
 
         # Identify codepoints in the removal ranges
-        codepoints_to_remove = [cp for cp in glyph.unicodes if is_codepoint_in_ranges(cp, ranges)]
+        codepoints_to_keep = range_index.exclude(glyph.unicodes)
 
-        if not codepoints_to_remove:
+        if len(codepoints_to_keep) == len(glyph.unicodes):
             print_progress_bar(i, total_glyphs)
             continue
 
         # Remove only the specified codepoints or mark the glyph for removal if no codepoints remain
-        if len(glyph.unicodes) > len(codepoints_to_remove):
-            glyph.unicodes = [cp for cp in glyph.unicodes if cp not in codepoints_to_remove]
+        if codepoints_to_keep:
+            glyph.unicodes = codepoints_to_keep
         else:
             glyphs_to_remove.add(glyph_name)
 
@@ -153,13 +122,13 @@ def remove_glyphs_in_ranges(ufo_font: ufoLib2.Font, ranges: list[tuple[int, int]
 
     # Second Pass: Identify composite references and adjust glyphs to remove accordingly
     print("Resolving composite references...")
-    component_references = build_component_reference_map(ufo_font)
-    for glyph_name, references in component_references.items():
+    component_graph = ComponentGraph.from_ufo(ufo_font)
+    for glyph_name in component_graph.referenced_glyphs():
         if glyph_name in glyphs_to_remove:
             continue
         # If a base glyph is marked for removal, but it is referenced by a composite not marked for removal,
         # retain the base glyph
-        references_to_keep = [ref for ref in references if ref not in glyphs_to_remove]
+        references_to_keep = [ref for ref in component_graph.referencing(glyph_name) if ref not in glyphs_to_remove]
         if not references_to_keep:
             glyphs_to_remove.add(glyph_name)
 
@@ -209,6 +178,26 @@ def clean_non_bmp_glyphs(ufo_font: ufoLib2.Font):
     print()  # Ensure the next output starts on a new line
 
 
+def prune_ufo_font(ufo_font: ufoLib2.Font, remove_empty=False, remove_dangling=False):
+    """Removes empty and/or dangling glyphs, as decided by `glyphs_to_prune`, from a merged UFO font."""
+    glyph_order = list(ufo_font.keys())
+    glyph_unicodes = {}
+    components = {}
+    empty_glyphs = set()
+    for glyph in ufo_font:
+        if glyph.unicodes:
+            glyph_unicodes[glyph.name] = glyph.unicodes
+        if glyph.components:
+            components[glyph.name] = [component.baseGlyph for component in glyph.components]
+        elif remove_empty and (glyph.is_empty() if isinstance(glyph, LazyGlyph) else not glyph.contours):
+            empty_glyphs.add(glyph.name)
+
+    removed = glyphs_to_prune(glyph_order, glyph_unicodes, components, '.notdef', empty_glyphs, remove_dangling)
+    for glyph_name in removed:
+        del ufo_font[glyph_name]
+    report_pruned(removed, empty_glyphs)
+
+
 def calculate_glyph_counts(ufo_font: ufoLib2.Font) -> tuple[int, int, int]:
     """
     Calculates the number of glyphs in the font that are addressable by codepoint,
@@ -235,29 +224,147 @@ def calculate_glyph_counts(ufo_font: ufoLib2.Font) -> tuple[int, int, int]:
     return glyphs_with_codepoints, glyphs_without_codepoints, total_glyphs
 
 
-def merge_fonts(font_paths, output=None, ufo_dir=None, keep_non_bmp=False, keep_all_ranges=False):
-    base_font_path = font_paths[0]
-    fallback_paths = font_paths[1:]
+def load_ufo_input(font_path: str, keep_non_bmp=False, ranges=(), packed=False, subset_ranges=None):
+    """
+    Converts the glyphs of a font that survive the `ranges` and non-BMP filters, or the codepoint
+    subset when `subset_ranges` is given, to UFO; packs the result if requested.
+
+    The filters run on the cmap and component references first, so dropped glyphs are never decoded.
+    """
+    glyph_unicodes = None
+    if ranges or not keep_non_bmp or subset_ranges is not None:
+        with profile_stage('select glyphs', font=font_path) as stage:
+            plan = GlyphPlan.read(font_path)
+            plan.apply_filters(RangeIndex(ranges) if ranges else None, keep_non_bmp, None if subset_ranges is None else RangeIndex(subset_ranges))
+            stage.glyphs = len(plan.glyph_order)
+        glyph_unicodes = plan.selection()
+        print(f"{font_path}: {len(glyph_unicodes)} glyphs left after filtering")
+    return convert_planned_input(font_path, packed, glyph_unicodes)
+
+
+def convert_planned_input(font_path: str, packed=False, glyph_unicodes=None):
+    """Converts only the glyphs in `glyph_unicodes` (every glyph if None), with those unicodes; packs the result if requested."""
+    with profile_stage('convert_ttfont_to_ufo', font=font_path) as stage, open_mapped_font(font_path) as tt_font:
+        ufo_font = convert_ttfont_to_ufo(tt_font, glyph_unicodes)
+        stage.glyphs = len(ufo_font)
+    return pack_ufo_font(ufo_font) if packed else ufo_font
+
+
+def merge_planned_fonts(font_paths, keep_non_bmp=False, ranges=(), jobs=1, subset_ranges=None) -> ufoLib2.Font:
+    """Plans glyph provenance from cmaps, then converts and combines only the glyphs that survive the merge."""
+    print("Planning merge from cmaps and component references...")
+    range_index = RangeIndex(ranges) if ranges else None
+    subset_index = None if subset_ranges is None else RangeIndex(subset_ranges)
+    with profile_stage('plan_ufo_merge') as stage:
+        selections = plan_ufo_merge(font_paths, range_index, keep_non_bmp, subset_index)
+        stage.glyphs = sum(len(glyph_unicodes) for glyph_unicodes in selections)
+    for font_path, glyph_unicodes in zip(font_paths, selections):
+        print(f"{font_path}: {len(glyph_unicodes)} glyphs to convert")
+
+    packed = resolve_jobs(jobs, len(font_paths)) > 1
+    ufo_main = None
+    font_args = [(glyph_unicodes,) for glyph_unicodes in selections]
+    for font_path, loaded in load_fonts(font_paths, convert_planned_input, packed, jobs=jobs, font_args=font_args):
+        u = unpack_ufo_font(loaded) if packed else loaded
+        if ufo_main is None:
+            ufo_main = u
+        else:
+            # The plan already resolved every name and unicode collision
+            with profile_stage('add planned glyphs', font=font_path) as stage:
+                stage.glyphs = len(u)
+                for glyph in u:
+                    ufo_main.addGlyph(glyph)
+    return ufo_main
+
+
+def default_output_path(base_font_path: str) -> str:
+    return f"{Path(base_font_path).stem}-Fallback{Path(base_font_path).suffix}"
 
-    if output is None:
-        output = f"{Path(base_font_path).stem}-Fallback{Path(base_font_path).suffix}"
 
-    print(f"Reading base font: {base_font_path}")
-    ufo_main = convert_ttfont_to_ufo(TTFont(base_font_path))
+def filter_ranges(keep_all_ranges=False, removed_ranges=None) -> list[tuple[int, int]]:
+    """Returns the codepoint ranges a merge drops: `removed_ranges`, `codepoint_ranges_to_remove` by default, or none."""
+    if keep_all_ranges:
+        return []
+    return codepoint_ranges_to_remove if removed_ranges is None else [tuple(r) for r in removed_ranges]
 
-    if not keep_all_ranges:
-        remove_glyphs_in_ranges(ufo_main, codepoint_ranges_to_remove)
-    if not keep_non_bmp:
-        clean_non_bmp_glyphs(ufo_main)
 
-    for fallback_path in fallback_paths:
-        print(f"Reading fallback font: {fallback_path}")
-        u = convert_ttfont_to_ufo(TTFont(fallback_path))
-        if not keep_all_ranges:
-            remove_glyphs_in_ranges(u, codepoint_ranges_to_remove)
-        if not keep_non_bmp:
-            clean_non_bmp_glyphs(u)
-        merge_ufo_fonts(ufo_main, u)
+def input_loader(ranges, keep_non_bmp, subset_ranges, packed, direct=False, low_memory=False) -> tuple:
+    """Returns the loader `merge_fonts` reads its inputs with and the arguments it passes, which also key the cache."""
+    if low_memory:
+        return read_source_index, (ranges, keep_non_bmp, subset_ranges)
+    if direct:
+        return read_source_font, (ranges, keep_non_bmp, subset_ranges)
+    return load_ufo_input, (keep_non_bmp, ranges, packed, subset_ranges)
+
+
+def merge_fonts(font_paths, output=None, ufo_dir=None, keep_non_bmp=False, keep_all_ranges=False, direct=False, jobs=1,
+                cache_dir=None, cache_size=DEFAULT_CACHE_SIZE_MB, incremental=False, plan=False, low_memory=False, fast_compile=False, font_cache=None,
+                subset_ranges=None, removed_ranges=None, remove_empty_glyphs=False, remove_dangling_glyphs=False,
+                dedupe_outlines=False):
+    """
+    Merges the fonts into `output`, with the first font as the base and the rest as fallbacks.
+
+    Codepoint ranges are lists of inclusive (start, end) pairs. Glyphs whose codepoints all fall
+    in `removed_ranges` (by default `codepoint_ranges_to_remove`, none with `keep_all_ranges`)
+    are dropped. `subset_ranges` instead restricts the output to the glyphs for its codepoints
+    and their components, and replaces the range and non-BMP filters.
+
+    `remove_empty_glyphs` and `remove_dangling_glyphs` drop glyphs without an outline and glyphs
+    that neither the cmap nor `.notdef` reach through components from the merged font.
+    `dedupe_outlines` stores every outline that repeats in the merged font only once.
+    """
+    base_font_path = font_paths[0]
+
+    if output is None:
+        output = default_output_path(base_font_path)
+
+    # A long-running server passes its in-memory cache, which takes the place of the cache directory
+    if font_cache is not None:
+        cache = font_cache
+    else:
+        cache = FontCache(cache_dir, cache_size << 20) if cache_dir else None
+
+    ranges = filter_ranges(keep_all_ranges, removed_ranges)
+    if subset_ranges is not None:
+        subset_ranges = [tuple(r) for r in subset_ranges]
+        print(f"Restricting the merged font to {count_codepoints(subset_ranges)} requested codepoints")
+
+    # Incremental and low-memory builds copy compiled glyph records, which only the direct engine does
+    if direct or incremental or low_memory:
+        merge_fonts_direct(font_paths, output, ranges, keep_non_bmp=keep_non_bmp, jobs=jobs, cache=cache, incremental=incremental,
+                           low_memory=low_memory, subset_ranges=subset_ranges, remove_empty_glyphs=remove_empty_glyphs,
+                           remove_dangling_glyphs=remove_dangling_glyphs)
+        return
+
+    if plan:
+        ufo_main = merge_planned_fonts(font_paths, keep_non_bmp=keep_non_bmp, ranges=ranges, jobs=jobs,
+                                       subset_ranges=subset_ranges)
+    else:
+        # Worker processes and the cache hand back packed fonts, which are rebuilt here in command-line order
+        packed = cache is not None or resolve_jobs(jobs, len(font_paths)) > 1
+        ufo_main = None
+        component_graph = None
+        loader, loader_args = input_loader(ranges, keep_non_bmp, subset_ranges, packed)
+        loaded_fonts = load_fonts(font_paths, loader, *loader_args, jobs=jobs, cache=cache)
+        for font_path, loaded in loaded_fonts:
+            u = unpack_ufo_font(loaded) if packed else loaded
+            if ufo_main is None:
+                ufo_main = u
+                component_graph = ComponentGraph.from_ufo(ufo_main)
+            else:
+                with profile_stage('merge_ufo_fonts', font=font_path) as stage:
+                    stage.glyphs = len(u)
+                    merge_ufo_fonts(ufo_main, u, component_graph)
+
+    if remove_empty_glyphs or remove_dangling_glyphs:
+        with profile_stage('prune glyphs') as stage:
+            stage.glyphs = len(ufo_main)
+            prune_ufo_font(ufo_main, remove_empty_glyphs, remove_dangling_glyphs)
+
+    if dedupe_outlines:
+        with profile_stage('dedupe outlines') as stage:
+            stage.glyphs = len(ufo_main)
+            dedupe_ufo_outlines(ufo_main)
 
     glyphs_with_codepoints, glyphs_without_codepoints, total_glyphs = calculate_glyph_counts(ufo_main)
 
@@ -270,11 +377,18 @@ def merge_fonts(font_paths, output=None, ufo_dir=None, keep_non_bmp=False, keep_
         path = Path(ufo_dir)
         if path.exists() and path.is_dir():
             shutil.rmtree(path)  # Delete the existing directory
-        ufo_main.save(path)
+        with profile_stage('save UFO'):
+            ufo_main.save(path)
 
     print("Compiling TTF...")
-    out_fft_font = compileTTF(ufo_main)
+    # ufo2ft is imported here rather than at the top, so direct merges never load it
+    from ufo2ft import compileTTF
+    from .compiler import compile_ufo_fast
+    with profile_stage('compile_ufo_fast' if fast_compile else 'compileTTF') as stage:
+        stage.glyphs = total_glyphs
+        out_fft_font = compile_ufo_fast(ufo_main, jobs=jobs) if fast_compile else compileTTF(ufo_main)
     print(f"Writing merged font to: {output}")
-    out_fft_font.save(output)
+    with profile_stage('save'):
+        out_fft_font.save(output)
 
     print("Mission Accomplished!")
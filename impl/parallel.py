@@ -0,0 +1,106 @@
+import concurrent.futures
+import contextlib
+import os
+
+from .profile import profile_stage
+
+
+def resolve_jobs(jobs: int, task_count: int) -> int:
+    """Returns the number of worker processes to use; 0 means one per CPU."""
+    if jobs <= 0:
+        jobs = os.cpu_count() or 1
+    return max(1, min(jobs, task_count))
+
+
+def process_pool(jobs: int, **kwargs):
+    """
+    Returns a process pool executor with `jobs` workers. concurrent.futures loads its process
+    pool module on first access, so commands that never start workers never import it.
+    """
+    return concurrent.futures.ProcessPoolExecutor(max_workers=jobs, **kwargs)
+
+
+def _run_quietly(loader, *args):
+    # Progress bars from several workers would garble each other on one console
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        return loader(*args)
+
+
+def _load_font(loader, font_path, args, cache):
+    if cache is None:
+        return loader(font_path, *args)
+    return cache.load(loader, font_path, *args)
+
+
+def load_fonts(font_paths, loader, *args, jobs=1, cache=None, preloaded=None, font_args=None, first_is_base=True):
+    """
+    Yields `(font_path, loader(font_path, *args))` for every font, in the order given.
+
+    With more than one job the loaders run concurrently in worker processes, so
+    `loader` must be a module-level function returning a picklable value. Results
+    are still yielded in command-line order, so callers merge them exactly as the
+    serial path does. Fallback fonts (all but the first) are read through `cache`
+    when one is given (the base font too, if the cache allows it), and fonts whose
+    index is in `preloaded` are not read at all.
+    `font_args` optionally holds one tuple per font, appended to the shared `args`.
+    Without `first_is_base`, every font is read and cached as a fallback.
+    """
+    preloaded = preloaded or {}
+
+    def font_args_at(i):
+        return args + tuple(font_args[i]) if font_args is not None else args
+
+    def cache_at(i):
+        return cache if cache is not None and (i > 0 or not first_is_base or cache.caches_base_font) else None
+
+    # A cache that worker processes cannot share is looked up here first, so only the misses go to workers
+    cached = {}
+    if jobs != 1 and cache is not None and not cache.shared_with_workers:
+        for i, font_path in enumerate(font_paths):
+            if i not in preloaded and cache_at(i) is not None:
+                result = cache.get(loader, font_path, *font_args_at(i))
+                if result is not None:
+                    cached[i] = result
+
+    to_read = [i for i in range(len(font_paths)) if i not in preloaded and i not in cached]
+    jobs = resolve_jobs(jobs, len(to_read))
+
+    def role(i):
+        return 'base' if i == 0 and first_is_base else 'fallback'
+
+    if jobs == 1:
+        for i, font_path in enumerate(font_paths):
+            if i in cached:
+                yield font_path, cached[i]
+                continue
+            if i in preloaded:
+                print(f"Reusing {role(i)} font from the previous build: {font_path}")
+                yield font_path, preloaded[i]
+                continue
+            print(f"Reading {role(i)} font: {font_path}")
+            with profile_stage(f"read {role(i)} font", font=font_path):
+                result = _load_font(loader, font_path, font_args_at(i), cache_at(i))
+            yield font_path, result
+        return
+
+    worker_cache = cache if cache is not None and cache.shared_with_workers else None
+    print(f"Reading {len(to_read)} fonts with {jobs} worker processes...")
+    with process_pool(jobs) as executor:
+        futures = {
+            i: executor.submit(_run_quietly, _load_font, loader, font_paths[i], font_args_at(i), worker_cache if cache_at(i) else None)
+            for i in to_read
+        }
+        for i, font_path in enumerate(font_paths):
+            if i in cached:
+                yield font_path, cached[i]
+                continue
+            if i in preloaded:
+                print(f"Reusing {role(i)} font from the previous build: {font_path}")
+                yield font_path, preloaded[i]
+                continue
+            with profile_stage(f"wait for {role(i)} font", font=font_path):
+                result = futures[i].result()
+            if cache_at(i) is not None and worker_cache is None:
+                cache.put(loader, font_path, font_args_at(i), result)
+            print(f"Read {role(i)} font: {font_path}")
+            yield font_path, result
@@ -0,0 +1,159 @@
+from .mapped import open_mapped_font
+from .ranges import RangeIndex
+from .components import ComponentGraph
+from .records import component_closure
+
+
+class GlyphPlan:
+    """Glyph names, unicodes and component references of one input, without outlines."""
+
+    def __init__(self, glyph_order: list[str], unicodes: dict[str, list[int]], components: dict[str, list[str]]):
+        self.glyph_order = glyph_order
+        self.unicodes = unicodes
+        self.components = components
+
+    @classmethod
+    def read(cls, font_path: str) -> 'GlyphPlan':
+        """Reads the cmap and the component names of every glyph, leaving outlines compiled."""
+        with open_mapped_font(font_path) as tt_font:
+            tt_glyf_table = tt_font['glyf']
+            glyph_order = list(tt_glyf_table.keys())
+
+            unicodes = {}
+            for codepoint, glyph_name in tt_font.getBestCmap().items():
+                unicodes.setdefault(glyph_name, []).append(codepoint)
+
+            components = {}
+            for glyph_name in glyph_order:
+                component_names = tt_glyf_table.glyphs[glyph_name].getComponentNames(tt_glyf_table)
+                if component_names:
+                    components[glyph_name] = component_names
+
+        return cls(glyph_order, unicodes, components)
+
+    def remove_glyphs_in_ranges(self, range_index: RangeIndex):
+        """Mirrors `merge.remove_glyphs_in_ranges` on names and unicodes only."""
+        glyphs_to_remove = set()
+        for glyph_name in self.glyph_order:
+            glyph_unicodes = self.unicodes.get(glyph_name, [])
+            codepoints_to_keep = range_index.exclude(glyph_unicodes)
+            if len(codepoints_to_keep) == len(glyph_unicodes):
+                continue
+            if codepoints_to_keep:
+                self.unicodes[glyph_name] = codepoints_to_keep
+            else:
+                glyphs_to_remove.add(glyph_name)
+
+        component_graph = ComponentGraph({glyph_name: self.components[glyph_name] for glyph_name in self.glyph_order if glyph_name in self.components})
+        for glyph_name in component_graph.referenced_glyphs():
+            if glyph_name in glyphs_to_remove:
+                continue
+            if all(ref in glyphs_to_remove for ref in component_graph.referencing(glyph_name)):
+                glyphs_to_remove.add(glyph_name)
+
+        self.remove(glyphs_to_remove)
+
+    def clean_non_bmp_glyphs(self):
+        """Mirrors `merge.clean_non_bmp_glyphs` on names and unicodes only."""
+        glyphs_to_remove = set()
+        for glyph_name in self.glyph_order:
+            bmp_unicodes = [cp for cp in self.unicodes.get(glyph_name, []) if cp <= 0xFFFF]
+            if bmp_unicodes:
+                self.unicodes[glyph_name] = bmp_unicodes
+            else:
+                glyphs_to_remove.add(glyph_name)
+        self.remove(glyphs_to_remove)
+
+    def keep_glyphs_in_ranges(self, range_index: RangeIndex):
+        """
+        Drops every codepoint outside the ranges, then every glyph that neither keeps a
+        codepoint nor is a component of one that does, at any depth. `.notdef` is kept.
+        """
+        roots = {'.notdef'} & set(self.glyph_order)
+        for glyph_name in self.glyph_order:
+            glyph_unicodes = range_index.select(self.unicodes.get(glyph_name, []))
+            if glyph_unicodes:
+                self.unicodes[glyph_name] = glyph_unicodes
+                roots.add(glyph_name)
+            else:
+                self.unicodes.pop(glyph_name, None)
+        kept = component_closure(roots, self.components)
+        self.remove({glyph_name for glyph_name in self.glyph_order if glyph_name not in kept})
+
+    def apply_filters(self, range_index: RangeIndex = None, keep_non_bmp=False, subset_index: RangeIndex = None):
+        """Applies the codepoint subset when given, or else the range and non-BMP filters, as a merge does."""
+        if subset_index is not None:
+            self.keep_glyphs_in_ranges(subset_index)
+            return
+        if range_index is not None:
+            self.remove_glyphs_in_ranges(range_index)
+        if not keep_non_bmp:
+            self.clean_non_bmp_glyphs()
+
+    def selection(self) -> dict[str, list[int]]:
+        """Returns the remaining glyphs with their unicodes, as `convert_ttfont_to_ufo` takes them."""
+        return {glyph_name: self.unicodes.get(glyph_name, []) for glyph_name in self.glyph_order}
+
+    def remove(self, glyph_names: set[str]):
+        self.glyph_order = [glyph_name for glyph_name in self.glyph_order if glyph_name not in glyph_names]
+        for glyph_name in glyph_names:
+            self.unicodes.pop(glyph_name, None)
+
+
+def plan_ufo_merge(font_paths, range_index: RangeIndex = None, keep_non_bmp=False, subset_index: RangeIndex = None) -> list[dict[str, list[int]]]:
+    """
+    Decides which glyph of which input ends up in the merged font, from cmaps and
+    component references alone.
+
+    The range and non-BMP filters (or, with `subset_index`, the codepoint subset that
+    replaces them) and `merge.merge_ufo_fonts` are replayed on glyph
+    names and unicodes, so converting only the planned glyphs and adding them to the
+    base yields the same font as converting and merging every input in full.
+
+    Returns:
+        One dict per input, mapping each glyph to convert to its final unicodes.
+    """
+    plans = []
+    for font_path in font_paths:
+        plan = GlyphPlan.read(font_path)
+        plan.apply_filters(range_index, keep_non_bmp, subset_index)
+        plans.append(plan)
+
+    base = plans[0]
+    merged_order = list(base.glyph_order)
+    origins = {glyph_name: 0 for glyph_name in merged_order}
+    component_graph = ComponentGraph({glyph_name: base.components[glyph_name] for glyph_name in merged_order if glyph_name in base.components})
+    referenced_unicodes = set()
+    for glyph_name in merged_order:
+        referenced_unicodes.update(base.unicodes.get(glyph_name, ()))
+
+    for index, plan in enumerate(plans[1:], start=1):
+        for glyph_name in plan.glyph_order:
+            glyph_unicodes = plan.unicodes.get(glyph_name, [])
+            if glyph_name in origins or any(cp in referenced_unicodes for cp in glyph_unicodes):
+                continue
+            merged_order.append(glyph_name)
+            origins[glyph_name] = index
+            component_graph.add(glyph_name, plan.components.get(glyph_name, ()))
+            referenced_unicodes.update(glyph_unicodes)
+
+        # Composites may reference glyphs that lost their unicode collision; take those, and their own components, from this input
+        available = set(plan.glyph_order)
+        missing_components = component_graph.missing(origins)
+        while missing_components:
+            component = missing_components.pop()
+            if component in origins or component not in available:
+                continue
+            merged_order.append(component)
+            origins[component] = index
+            component_unicodes = [cp for cp in plan.unicodes.get(component, []) if cp not in referenced_unicodes]
+            plan.unicodes[component] = component_unicodes
+            referenced_unicodes.update(component_unicodes)
+            component_graph.add(component, plan.components.get(component, ()))
+            missing_components.extend(component_graph.components_of(component))
+
+    selections = [{} for _ in plans]
+    for glyph_name in merged_order:
+        plan = plans[origins[glyph_name]]
+        selections[origins[glyph_name]][glyph_name] = plan.unicodes.get(glyph_name, [])
+    return selections
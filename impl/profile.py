@@ -0,0 +1,140 @@
+import contextlib
+import json
+import os
+import sys
+import time
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+
+def peak_rss_mb() -> float:
+    """Returns the peak resident set size of this process so far, in MiB, or 0 if unknown."""
+    if resource is None:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in bytes on macOS and in kilobytes elsewhere
+    return peak / (1 << 20) if sys.platform == 'darwin' else peak / 1024
+
+
+class Stage:
+    """Measurements of one timed stage; `glyphs` may be set by the caller while the stage runs."""
+
+    __slots__ = ('name', 'depth', 'args', 'start', 'wall', 'cpu', 'peak_rss_mb', 'glyphs')
+
+    def __init__(self, name: str, depth: int, args: dict):
+        self.name = name
+        self.depth = depth
+        self.args = args
+        self.start = 0.0
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.peak_rss_mb = 0.0
+        self.glyphs = None
+
+
+class Profiler:
+    """
+    Records wall time, CPU time, peak RSS and glyph counts of nested stages.
+
+    Only this process is measured; stages run inside worker processes (`--jobs`)
+    show up as the time the main process spends waiting for their results.
+    """
+
+    def __init__(self):
+        self.stages = []
+        self.origin = time.perf_counter()
+        self._depth = 0
+
+    @contextlib.contextmanager
+    def stage(self, name: str, **args):
+        stage = Stage(name, self._depth, args)
+        self.stages.append(stage)
+        self._depth += 1
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield stage
+        finally:
+            stage.start = wall_start - self.origin
+            stage.wall = time.perf_counter() - wall_start
+            stage.cpu = time.process_time() - cpu_start
+            stage.peak_rss_mb = peak_rss_mb()
+            self._depth -= 1
+
+    def write_summary(self, output_stream):
+        """Writes one row per stage, nested stages indented under the stage that ran them."""
+        output_stream.write(f"\n{'Stage':<50}{'Wall s':>10}{'CPU s':>10}{'Peak RSS MiB':>14}{'Glyphs':>10}\n")
+        output_stream.write("=" * 94 + "\n")
+        for stage in self.stages:
+            label = "  " * stage.depth + stage.name
+            if 'font' in stage.args:
+                label += f" ({os.path.basename(stage.args['font'])})"
+            glyphs = "" if stage.glyphs is None else str(stage.glyphs)
+            output_stream.write(f"{label:<50}{stage.wall:>10.3f}{stage.cpu:>10.3f}{stage.peak_rss_mb:>14.1f}{glyphs:>10}\n")
+
+    def write_trace(self, path: str):
+        """Writes the stages as complete events in the Chrome trace-event format (chrome://tracing, Perfetto)."""
+        pid = os.getpid()
+        events = []
+        for stage in self.stages:
+            args = dict(stage.args, cpu_seconds=round(stage.cpu, 6), peak_rss_mb=round(stage.peak_rss_mb, 1))
+            if stage.glyphs is not None:
+                args['glyphs'] = stage.glyphs
+            events.append({
+                'name': stage.name,
+                'cat': 'font-mate',
+                'ph': 'X',
+                'ts': round(stage.start * 1e6),
+                'dur': round(stage.wall * 1e6),
+                'pid': pid,
+                'tid': 0,
+                'args': args,
+            })
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f, indent=1)
+
+
+_active_profiler = None
+
+
+@contextlib.contextmanager
+def profile_stage(name: str, **args):
+    """
+    Times the enclosed code as a stage of the active profiler; a no-op when profiling is off.
+
+    Yields the stage, so the caller can record the number of glyphs it processed.
+    """
+    if _active_profiler is None:
+        yield Stage(name, 0, args)
+        return
+    with _active_profiler.stage(name, **args) as stage:
+        yield stage
+
+
+@contextlib.contextmanager
+def profiling(command: str, summary=False, trace_path=None):
+    """
+    Runs the enclosed command as the root stage of a new active profiler, then writes
+    the summary table to stderr and/or the Chrome trace to `trace_path`. Does nothing
+    if neither is requested.
+    """
+    global _active_profiler
+    if not summary and not trace_path:
+        yield None
+        return
+
+    profiler = Profiler()
+    _active_profiler = profiler
+    try:
+        with profiler.stage(command):
+            yield profiler
+    finally:
+        _active_profiler = None
+        if summary:
+            profiler.write_summary(sys.stderr)
+        if trace_path:
+            profiler.write_trace(trace_path)
+            print(f"Profile trace written to: {trace_path}", file=sys.stderr)
@@ -0,0 +1,160 @@
+import json
+import re
+from pathlib import Path
+
+from .codepoints import MAX_CODEPOINT
+from .regions import UNICODE_RANGES
+from .subset import coalesce_ranges, parse_unicodes
+
+# Dropped by the "default" profile: blocks that fallback stacks rarely need and that cost many glyphs
+codepoint_ranges_to_remove = [
+    (0x0250, 0x02AF),  # IPA Extensions
+    (0x0300, 0x036F),  # Combining Diacritical Marks
+    (0x0500, 0x052F),  # Cyrillic Supplement
+    (0x0900, 0x097F),  # Devanagari
+    (0x10A0, 0x10FF),  # Georgian
+    (0x1100, 0x11FF),  # Hangul Jamo
+    (0x1AB0, 0x1AFF),  # Combining Diacritical Marks Extended
+    (0x1C80, 0x1C8F),  # Cyrillic Extended C
+    (0x1D00, 0x1D7F),  # Phonetic Extensions
+    (0x1D80, 0x1DBF),  # Phonetic Extensions Supplement
+    (0x1DC0, 0x1DFF),  # Combining Diacritical Marks Supplement
+    (0x1E00, 0x1EFF),  # Latin Extended Additional
+    (0x1F00, 0x1FFF),  # Greek Extended
+    (0x2400, 0x243F),  # Control Pictures
+    (0x2700, 0x27BF),  # Dingbats
+    (0x2900, 0x297F),  # Supplemental Arrows B
+    (0x2980, 0x29FF),  # Miscellaneous Mathematical Symbols B
+    (0x2B00, 0x2BFF),  # Miscellaneous Symbols and Arrows
+    (0x2C60, 0x2C7F),  # Latin Extended C
+    (0x2DE0, 0x2DFF),  # Cyrillic Extended A
+    (0x2E00, 0x2E7F),  # Supplemental Punctuation
+    (0x2E80, 0x2EFF),  # CJK Radicals Supplement
+    (0x2F00, 0x2FDF),  # Kangxi Radicals
+    (0x2FF0, 0x2FFF),  # Ideographic Description Characters
+    (0x3190, 0x319F),  # Kanbun
+    (0x31A0, 0x31BF),  # Bopomofo Extended
+    (0x31C0, 0x31EF),  # CJK Strokes
+    (0x31F0, 0x31FF),  # Katakana Phonetic Extensions
+    (0xA700, 0xA71F),  # Modifier Tone Letters
+    (0xA720, 0xA7FF),  # Latin Extended D
+    (0xA8E0, 0xA8FF),  # Devanagari Extended
+    (0xA900, 0xA92F),  # Kayah Li
+    (0xA960, 0xA97F),  # Hangul Jamo Extended A
+    (0xAB30, 0xAB6F),  # Latin Extended E
+    (0xD7B0, 0xD7FF),  # Hangul Jamo Extended B
+    (0xFB00, 0xFB4F),  # Alphabetic Presentation Forms
+    (0xFE00, 0xFE0F),  # Variation Selectors
+    (0xFE10, 0xFE1F),  # Vertical Forms
+    (0xFE20, 0xFE2F),  # Combining Half Marks
+    (0xFE70, 0xFEFF),  # Arabic Presentation Forms B
+    (0xFFF0, 0xFFFF),  # Specials
+]
+
+
+def region_key(name: str) -> str:
+    return re.sub(r'[\s_-]', '', name).lower()
+
+
+# Unicode regions by name, as `coverage` reports them; spaces, dashes and case are ignored
+REGIONS = {region_key(region): (start, end) for start, end, region in UNICODE_RANGES}
+
+
+def parse_range_entry(entry) -> list[tuple[int, int]]:
+    """Resolves one profile entry, a Unicode region name or codepoints in the `--unicodes` syntax, to ranges."""
+    if not isinstance(entry, str):
+        raise ValueError(f"range profile entries must be strings, not {entry!r}")
+    region = REGIONS.get(region_key(entry))
+    if region is not None:
+        return [region]
+    try:
+        return parse_unicodes(entry)
+    except ValueError:
+        raise ValueError(f"{entry!r} is neither a Unicode region nor a codepoint range") from None
+
+
+class RangeProfile:
+    """
+    A named range filter. When `keep` is given, codepoints outside it are removed;
+    codepoints inside `drop` are removed either way.
+    """
+
+    def __init__(self, name: str, keep: list[tuple[int, int]] = None, drop: list[tuple[int, int]] = ()):
+        self.name = name
+        self.keep = keep
+        self.drop = list(drop)
+
+    @classmethod
+    def from_dict(cls, name: str, data: dict) -> 'RangeProfile':
+        if not isinstance(data, dict):
+            raise ValueError(f"range profile {name!r} must be a table with 'keep' and/or 'drop' lists")
+        unknown = set(data) - {'keep', 'drop'}
+        if unknown:
+            raise ValueError(f"range profile {name!r} has unknown keys: {', '.join(sorted(unknown))}")
+        keep = None
+        if 'keep' in data:
+            keep = [r for entry in data['keep'] for r in parse_range_entry(entry)]
+        drop = [r for entry in data.get('drop', ()) for r in parse_range_entry(entry)]
+        return cls(name, keep, drop)
+
+    def removed_ranges(self) -> list[tuple[int, int]]:
+        """Compiles the profile into the sorted, disjoint ranges of removed codepoints that `RangeIndex` looks up."""
+        removed = list(self.drop)
+        if self.keep is not None:
+            next_start = 0
+            for start, end in coalesce_ranges(self.keep):
+                if start > next_start:
+                    removed.append((next_start, start - 1))
+                next_start = end + 1
+            if next_start <= MAX_CODEPOINT:
+                removed.append((next_start, MAX_CODEPOINT))
+        return coalesce_ranges(removed)
+
+
+BUILTIN_PROFILES = {
+    'default': RangeProfile('default', drop=codepoint_ranges_to_remove),
+    'none': RangeProfile('none'),
+}
+
+
+def read_config_file(path: str) -> dict:
+    """Reads a TOML file, or a JSON file for any other extension."""
+    if Path(path).suffix.lower() != '.toml':
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    try:
+        import tomllib
+    except ImportError:
+        try:
+            import tomli as tomllib
+        except ImportError:
+            raise ValueError(f"reading {path} needs Python 3.11 or the tomli package; a JSON profile file works everywhere") from None
+    with open(path, 'rb') as f:
+        return tomllib.load(f)
+
+
+def load_range_profiles(path: str) -> dict[str, RangeProfile]:
+    """Reads range profiles from a TOML or JSON file: one table per profile name, each with optional `keep` and `drop` lists."""
+    data = read_config_file(path)
+    if not isinstance(data, dict):
+        raise ValueError(f"{path} must map profile names to profiles")
+    return {name: RangeProfile.from_dict(name, profile) for name, profile in data.items()}
+
+
+def find_range_profile(name: str = None, profiles_path: str = None) -> RangeProfile:
+    """
+    Returns the named profile, from `profiles_path` or the built-in ones. Without a name,
+    the only profile of `profiles_path`, or else the "default" profile, is used.
+    """
+    profiles = dict(BUILTIN_PROFILES)
+    if profiles_path is not None:
+        file_profiles = load_range_profiles(profiles_path)
+        if name is None:
+            if len(file_profiles) != 1:
+                raise ValueError(f"{profiles_path} defines {len(file_profiles)} range profiles; choose one with --range-profile")
+            name = next(iter(file_profiles))
+        profiles.update(file_profiles)
+    name = name or 'default'
+    if name not in profiles:
+        raise ValueError(f"unknown range profile {name!r}; available: {', '.join(profiles)}")
+    return profiles[name]
@@ -0,0 +1,62 @@
+import unicodedata
+
+from .ranges import RangeIndex
+from .records import dangling_glyphs
+
+# Characters shown as blank space, or not drawn at all, whose glyphs are empty by design
+BLANK_CATEGORIES = {'Zs', 'Zl', 'Zp', 'Cc', 'Cf'}
+# Blank characters of other categories: default-ignorable marks and fillers, variation selectors and the empty Braille pattern
+BLANK_RANGES = RangeIndex([
+    (0x034F, 0x034F),
+    (0x115F, 0x1160),
+    (0x17B4, 0x17B5),
+    (0x180B, 0x180F),
+    (0x2800, 0x2800),
+    (0x3164, 0x3164),
+    (0xFE00, 0xFE0F),
+    (0xFFA0, 0xFFA0),
+    (0xE0100, 0xE01EF),
+])
+
+# Names listed per kind of removed glyph before the report is cut short
+REPORTED_NAMES = 20
+
+
+def is_blank_codepoint(codepoint: int) -> bool:
+    return codepoint in BLANK_RANGES or unicodedata.category(chr(codepoint)) in BLANK_CATEGORIES
+
+
+def glyphs_to_prune(glyph_order: list[str], glyph_unicodes: dict[str, list[int]], components: dict[str, list[str]], notdef: str,
+                    empty_glyphs=frozenset(), remove_dangling=False) -> list[str]:
+    """
+    Returns the glyphs, in glyph order, that `--remove-empty-glyphs` and `--remove-dangling-glyphs`
+    drop, found with one reachability pass over the component references.
+
+    The roots are `notdef` and the glyphs in `glyph_unicodes`, plus every other glyph unless
+    `remove_dangling` is set. Glyphs in `empty_glyphs` are only roots when mapped to a blank
+    character, so they go too, along with their codepoints, unless a kept glyph uses them.
+    """
+    roots = [notdef]
+    for glyph_name in glyph_order:
+        unicodes = glyph_unicodes.get(glyph_name)
+        if glyph_name in empty_glyphs:
+            if unicodes and any(is_blank_codepoint(codepoint) for codepoint in unicodes):
+                roots.append(glyph_name)
+        elif unicodes or not remove_dangling:
+            roots.append(glyph_name)
+    return dangling_glyphs(glyph_order, roots, components)
+
+
+def report_pruned(removed: list[str], empty_glyphs):
+    """Prints how many empty and dangling glyphs were removed, and their names."""
+    empty = [glyph_name for glyph_name in removed if glyph_name in empty_glyphs]
+    dangling = [glyph_name for glyph_name in removed if glyph_name not in empty_glyphs]
+    for kind, glyph_names in (('empty', empty), ('dangling', dangling)):
+        if not glyph_names:
+            continue
+        listed = ', '.join(glyph_names[:REPORTED_NAMES])
+        if len(glyph_names) > REPORTED_NAMES:
+            listed += f" and {len(glyph_names) - REPORTED_NAMES} more"
+        print(f"Removed {len(glyph_names)} {kind} glyphs: {listed}")
+    if not removed:
+        print("No empty or dangling glyphs to remove")
@@ -0,0 +1,73 @@
+from bisect import bisect_right
+
+
+class RangeIndex:
+    """
+    Precomputed lookup over a list of inclusive (start, end) codepoint ranges.
+
+    Ranges are sorted by start so that a codepoint is located with one bisect
+    instead of a scan over every range. Positions returned by the lookups refer
+    to the order of the ranges as given, so they can index a parallel list of
+    region names. Overlapping ranges are rejected.
+    """
+
+    def __init__(self, ranges):
+        ranges = [(start, end) for start, end, *_ in ranges]
+        order = sorted(range(len(ranges)), key=lambda i: ranges[i][0])
+        self.starts = [ranges[i][0] for i in order]
+        self.ends = [ranges[i][1] for i in order]
+        self.positions = order
+        self.size = len(ranges)
+
+        for i in range(1, len(order)):
+            if self.starts[i] <= self.ends[i - 1]:
+                raise ValueError(f"Overlapping codepoint ranges at U+{self.starts[i]:04X}")
+
+    def find(self, codepoint: int) -> int:
+        """Returns the position of the range containing the codepoint, or -1."""
+        i = bisect_right(self.starts, codepoint) - 1
+        if i >= 0 and codepoint <= self.ends[i]:
+            return self.positions[i]
+        return -1
+
+    def __contains__(self, codepoint: int) -> bool:
+        i = bisect_right(self.starts, codepoint) - 1
+        return i >= 0 and codepoint <= self.ends[i]
+
+    def classify(self, codepoints) -> list[int]:
+        """Returns the range position (or -1) of every codepoint, in input order."""
+        starts, ends, positions = self.starts, self.ends, self.positions
+        result = []
+        for codepoint in codepoints:
+            i = bisect_right(starts, codepoint) - 1
+            result.append(positions[i] if i >= 0 and codepoint <= ends[i] else -1)
+        return result
+
+    def count(self, codepoints) -> list[int]:
+        """
+        Counts the codepoints falling into each range in a single merge pass.
+
+        Returns:
+            A list with one count per range, in the order the ranges were given.
+        """
+        counts = [0] * self.size
+        starts, ends, positions = self.starts, self.ends, self.positions
+        i = 0
+        for codepoint in sorted(codepoints):
+            while i < len(starts) and ends[i] < codepoint:
+                i += 1
+            if i == len(starts):
+                break
+            if codepoint >= starts[i]:
+                counts[positions[i]] += 1
+        return counts
+
+    def exclude(self, codepoints) -> list[int]:
+        """Returns the codepoints that fall outside every range, in input order."""
+        codepoints = list(codepoints)
+        return [codepoint for codepoint, position in zip(codepoints, self.classify(codepoints)) if position < 0]
+
+    def select(self, codepoints) -> list[int]:
+        """Returns the codepoints that fall inside a range, in input order."""
+        codepoints = list(codepoints)
+        return [codepoint for codepoint, position in zip(codepoints, self.classify(codepoints)) if position >= 0]
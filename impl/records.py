@@ -0,0 +1,113 @@
+import struct
+from dataclasses import dataclass, field
+
+from fontTools.ttLib.tables._g_l_y_f import (
+    ARG_1_AND_2_ARE_WORDS,
+    WE_HAVE_A_SCALE,
+    WE_HAVE_AN_X_AND_Y_SCALE,
+    WE_HAVE_A_TWO_BY_TWO,
+    MORE_COMPONENTS,
+)
+
+MAXP_OUTLINE_FIELDS = (
+    'maxPoints',
+    'maxContours',
+    'maxCompositePoints',
+    'maxCompositeContours',
+    'maxComponentElements',
+    'maxComponentDepth',
+)
+
+
+@dataclass
+class SourceFont:
+    """Post-filter glyph records of one input font, kept as compiled glyf blobs."""
+    path: str
+    glyph_order: list[str] = field(default_factory=list)
+    glyph_data: dict[str, bytes] = field(default_factory=dict)
+    components: dict[str, list[str]] = field(default_factory=dict)
+    metrics: dict[str, tuple[int, int]] = field(default_factory=dict)
+    unicodes: dict[str, list[int]] = field(default_factory=dict)
+    maxp: dict[str, int] = field(default_factory=dict)
+    # Kept glyphs the input's cmap never mapped, which `keep_non_bmp` merges on their own
+    unencoded: list[str] = field(default_factory=list)
+    # (start, end) file offsets of each glyph record, for sources read without their glyph data
+    glyph_locations: dict[str, tuple[int, int]] = field(default_factory=dict)
+
+
+def source_glyph_is_empty(source: SourceFont, glyph_name: str) -> bool:
+    """Whether a glyph kept in a source has no outline, judged from its record or its location in the file."""
+    data = source.glyph_data.get(glyph_name)
+    if data is None:
+        start, end = source.glyph_locations[glyph_name]
+        return end <= start
+    return not data
+
+
+def remap_component_ids(data: bytes, glyph_ids: list[int]) -> bytes:
+    """Rewrites the component glyph IDs of a compiled composite glyph record."""
+    data = bytearray(data)
+    i = 10
+    for glyph_id in glyph_ids:
+        flags = (data[i] << 8) | data[i + 1]
+        struct.pack_into(">H", data, i + 2, glyph_id)
+        i += 4
+        i += 4 if flags & ARG_1_AND_2_ARE_WORDS else 2
+        if flags & WE_HAVE_A_SCALE:
+            i += 2
+        elif flags & WE_HAVE_AN_X_AND_Y_SCALE:
+            i += 4
+        elif flags & WE_HAVE_A_TWO_BY_TWO:
+            i += 8
+        if not flags & MORE_COMPONENTS:
+            break
+    return bytes(data)
+
+
+def read_component_ids(data, offset: int = 0) -> list[int]:
+    """Returns the component glyph IDs of the compiled composite glyph record starting at `offset`."""
+    glyph_ids = []
+    i = offset + 10
+    while True:
+        flags, glyph_id = struct.unpack_from(">HH", data, i)
+        glyph_ids.append(glyph_id)
+        i += 4
+        i += 4 if flags & ARG_1_AND_2_ARE_WORDS else 2
+        if flags & WE_HAVE_A_SCALE:
+            i += 2
+        elif flags & WE_HAVE_AN_X_AND_Y_SCALE:
+            i += 4
+        elif flags & WE_HAVE_A_TWO_BY_TWO:
+            i += 8
+        if not flags & MORE_COMPONENTS:
+            return glyph_ids
+
+
+def component_closure(roots, components: dict[str, list[str]]) -> set[str]:
+    """Returns the roots plus every glyph reachable from them through components."""
+    reached = set()
+    stack = list(roots)
+    while stack:
+        glyph_name = stack.pop()
+        if glyph_name in reached:
+            continue
+        reached.add(glyph_name)
+        stack.extend(components.get(glyph_name, ()))
+    return reached
+
+
+def dangling_glyphs(glyph_order: list[str], roots, components: dict[str, list[str]]) -> list[str]:
+    """
+    Returns the glyphs, in glyph order, that are not reachable from the roots through
+    components. With the cmap-addressed glyphs and `.notdef` as roots, these are the
+    glyphs no text can ever display.
+    """
+    reached = component_closure(roots, components)
+    return [glyph_name for glyph_name in glyph_order if glyph_name not in reached]
+
+
+def glyph_bounds(data: bytes):
+    """Returns (xMin, yMin, xMax, yMax) from the header of a compiled glyph record, or None."""
+    if not data:
+        return None
+    return struct.unpack(">hhhh", data[2:10])
@@ -0,0 +1,154 @@
+import contextlib
+import io
+import json
+import os
+import socket
+import socketserver
+import sys
+import tempfile
+import threading
+import time
+import traceback
+
+from .cache import MemoryFontCache
+
+
+def default_socket_path() -> str:
+    """Returns a per-user socket path in the temporary directory."""
+    suffix = f"-{os.getuid()}" if hasattr(os, 'getuid') else ""
+    return os.path.join(tempfile.gettempdir(), f"font-mate{suffix}.sock")
+
+
+def run_request(request: dict, run_command, font_cache: MemoryFontCache) -> dict:
+    """
+    Runs one request as `run_command(args, font_cache)` would run from the command line,
+    in the request's working directory, and returns its exit code and captured output.
+    """
+    stdout = io.StringIO()
+    stderr = io.StringIO()
+    exit_code = 0
+    start = time.perf_counter()
+    previous_cwd = os.getcwd()
+    try:
+        args = request.get('args')
+        if not isinstance(args, list) or not all(isinstance(arg, str) for arg in args):
+            raise ValueError("a request needs 'args', a list of strings, or a 'command'")
+        os.chdir(request.get('cwd', previous_cwd))
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            run_command(args, font_cache)
+    except SystemExit as e:
+        if isinstance(e.code, str):
+            stderr.write(e.code + "\n")
+            exit_code = 1
+        else:
+            exit_code = e.code or 0
+    except Exception as e:
+        stderr.write(f"Error: {e}\n" if isinstance(e, (ValueError, OSError)) else traceback.format_exc())
+        exit_code = 1
+    finally:
+        os.chdir(previous_cwd)
+    return {
+        'exit_code': exit_code,
+        'stdout': stdout.getvalue(),
+        'stderr': stderr.getvalue(),
+        'seconds': round(time.perf_counter() - start, 3),
+    }
+
+
+def cache_stats(font_cache: MemoryFontCache) -> dict:
+    return {
+        'entries': len(font_cache.entries),
+        'bytes': font_cache.total_bytes,
+        'max_bytes': font_cache.max_bytes,
+        'hits': font_cache.hits,
+        'misses': font_cache.misses,
+    }
+
+
+class RequestHandler(socketserver.StreamRequestHandler):
+    """Answers newline-delimited JSON requests on one connection until the client closes it."""
+
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    raise ValueError("a request must be a JSON object")
+            except ValueError as e:
+                response = {'exit_code': 1, 'stdout': '', 'stderr': f"Error: invalid request: {e}\n", 'seconds': 0.0}
+            else:
+                command = request.get('command')
+                if command == 'stats':
+                    response = cache_stats(self.server.font_cache)
+                elif command == 'shutdown':
+                    response = {'exit_code': 0}
+                    self.server.stopping = True
+                    # shutdown() waits for serve_forever() to return, which runs this handler
+                    threading.Thread(target=self.server.shutdown).start()
+                else:
+                    response = run_request(request, self.server.run_command, self.server.font_cache)
+            self.wfile.write(json.dumps(response).encode('utf-8') + b"\n")
+            self.wfile.flush()
+            if self.server.stopping:
+                return
+
+
+class FontMateServer(socketserver.UnixStreamServer):
+    """
+    Serves one connection at a time: requests change the working directory and
+    redirect the output of this process, so they must not overlap.
+    """
+
+    def __init__(self, socket_path: str, run_command, font_cache: MemoryFontCache):
+        self.run_command = run_command
+        self.font_cache = font_cache
+        self.stopping = False
+        super().__init__(socket_path, RequestHandler)
+
+
+def serve(socket_path: str, run_command, font_cache: MemoryFontCache):
+    """
+    Listens on a Unix socket and runs the `merge` and `coverage` requests sent to it.
+
+    Each request is a JSON object on its own line: `{"args": [...], "cwd": "..."}`, where
+    `args` are the command-line arguments after `font-mate` and `cwd` is the directory
+    relative paths are resolved against. The reply is one line with the exit code, the
+    captured stdout and stderr and the elapsed seconds. `{"command": "stats"}` reports the
+    cache, and `{"command": "shutdown"}` stops the server. Input fonts stay in `font_cache`
+    between requests, so fonts that did not change since an earlier request are not read again.
+    """
+    if not hasattr(socket, 'AF_UNIX'):
+        print("Error: Unix sockets are not available on this platform.")
+        sys.exit(1)
+
+    if os.path.exists(socket_path):
+        # Refuse to take over the socket of a server that is still running
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+            try:
+                probe.connect(socket_path)
+            except OSError:
+                os.unlink(socket_path)  # Left behind by a server that did not shut down cleanly
+            else:
+                print(f"Error: A server is already listening on {socket_path}")
+                sys.exit(1)
+
+    # Bind under a umask that leaves the socket to its owner, so there is no moment
+    # at which other users can connect to it
+    previous_umask = os.umask(0o177)
+    try:
+        server = FontMateServer(socket_path, run_command, font_cache)
+    finally:
+        os.umask(previous_umask)
+
+    with server:
+        os.chmod(socket_path, 0o600)  # Some platforms ignore the umask for sockets
+        print(f"Listening on {socket_path} (cache limit {font_cache.max_bytes >> 20} MB)")
+        try:
+            server.serve_forever(poll_interval=0.2)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            os.unlink(socket_path)
+    print("Server stopped.")
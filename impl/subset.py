@@ -0,0 +1,86 @@
+import re
+
+from .codepoints import MAX_CODEPOINT
+
+# A hexadecimal codepoint, optionally prefixed with U+ or 0x, or an inclusive range of two
+UNICODE_TOKEN_PATTERN = re.compile(r'(?:[Uu]\+|0[xX])?([0-9A-Fa-f]+)(?:-(?:[Uu]\+|0[xX])?([0-9A-Fa-f]+))?')
+
+
+def coalesce_ranges(ranges) -> list[tuple[int, int]]:
+    """Sorts inclusive (start, end) ranges and joins the ones that overlap or touch."""
+    result = []
+    for start, end in sorted(ranges):
+        if result and start <= result[-1][1] + 1:
+            if end > result[-1][1]:
+                result[-1] = (result[-1][0], end)
+        else:
+            result.append((start, end))
+    return result
+
+
+def parse_unicodes(text: str) -> list[tuple[int, int]]:
+    """
+    Parses codepoints such as `U+20AC`, `0x41` or `41` and ranges such as `U+0041-005A`,
+    separated by commas or whitespace, into sorted inclusive ranges.
+    """
+    ranges = []
+    for token in re.split(r'[\s,]+', text.strip()):
+        if not token:
+            continue
+        match = UNICODE_TOKEN_PATTERN.fullmatch(token)
+        if match is None:
+            raise ValueError(f"invalid codepoint or range: {token!r}")
+        start = int(match[1], 16)
+        end = int(match[2] or match[1], 16)
+        if end < start or end > MAX_CODEPOINT:
+            raise ValueError(f"invalid codepoint or range: {token!r}")
+        ranges.append((start, end))
+    return coalesce_ranges(ranges)
+
+
+def read_unicodes_file(path: str) -> list[tuple[int, int]]:
+    """Reads codepoints and ranges in the `parse_unicodes` syntax from a file; `#` starts a comment."""
+    ranges = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            ranges.extend(parse_unicodes(line.split('#', 1)[0]))
+    return coalesce_ranges(ranges)
+
+
+def is_control_codepoint(codepoint: int) -> bool:
+    """Whether a codepoint is a C0 or C1 control character, such as a line ending or a tab."""
+    return codepoint < 0x20 or 0x7F <= codepoint <= 0x9F
+
+
+def read_text_file(path: str) -> list[tuple[int, int]]:
+    """
+    Returns the codepoints of every character in a UTF-8 text file, as inclusive ranges.
+    Control characters, line endings included, and a leading byte order mark are left out,
+    since no font draws them.
+    """
+    codepoints = set()
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        for line in f:
+            codepoints.update(map(ord, line))
+    return coalesce_ranges((codepoint, codepoint) for codepoint in codepoints if not is_control_codepoint(codepoint))
+
+
+def subset_ranges_from_options(unicodes: list[str] = None, unicodes_files: list[str] = None, text_files: list[str] = None):
+    """
+    Returns the union of the codepoints given on the command line and in the listed files,
+    as sorted inclusive ranges, or None when no codepoints were requested at all.
+    """
+    if not (unicodes or unicodes_files or text_files):
+        return None
+    ranges = []
+    for text in unicodes or ():
+        ranges.extend(parse_unicodes(text))
+    for path in unicodes_files or ():
+        ranges.extend(read_unicodes_file(path))
+    for path in text_files or ():
+        ranges.extend(read_text_file(path))
+    return coalesce_ranges(ranges)
+
+
+def count_codepoints(ranges) -> int:
+    return sum(end - start + 1 for start, end in ranges)
@@ -1,8 +1,68 @@
+import struct
 import sys
 from fontTools.ttLib import TTFont
+from fontTools.ttLib.tables._g_l_y_f import Glyph as TTGlyph
 import ufoLib2
+from ufoLib2.objects import Contour, Glyph, Point
 from ufoLib2.objects.component import Component
 
+UFO_INFO_ATTRIBUTES = ('familyName', 'styleName', 'unitsPerEm', 'ascender', 'descender')
+
+# The slot that stores the contours of a ufoLib2 glyph, behind the property of `LazyGlyph`
+_CONTOURS_SLOT = Glyph.contours
+
+
+class LazyGlyph(Glyph):
+    """
+    A UFO glyph converted from a simple TrueType glyph, whose contours are only drawn
+    from the compiled glyf record the first time they are used, by a compiler or a save.
+
+    Name, width and unicodes are set up front, so filtering and merging never draw
+    the glyphs they drop. Setting `contours` replaces the pending outline.
+    """
+
+    __slots__ = ('_tt_glyph', '_lsb')
+
+    @classmethod
+    def from_tt_glyph(cls, name: str, width, unicodes: list[int], tt_glyph: TTGlyph, lsb: int) -> 'LazyGlyph':
+        # Not an __init__ argument: ufo2ft copies glyphs by calling their class with the ufoLib2 arguments
+        glyph = cls(name, width=width, unicodes=unicodes)
+        glyph._tt_glyph = tt_glyph
+        glyph._lsb = lsb
+        return glyph
+
+    @property
+    def contours(self) -> list[Contour]:
+        tt_glyph = getattr(self, '_tt_glyph', None)
+        if tt_glyph is not None:
+            self._tt_glyph = None
+            # Same outline as drawing the glyph from a TTFont glyph set: points shifted so xMin lands on the left side bearing
+            tt_glyph.expand(None)
+            offset = self._lsb - tt_glyph.xMin if hasattr(tt_glyph, 'xMin') else 0
+            tt_glyph.draw(self.getPen(), None, offset)
+        return _CONTOURS_SLOT.__get__(self)
+
+    @contours.setter
+    def contours(self, contours: list[Contour]):
+        self._tt_glyph = None
+        _CONTOURS_SLOT.__set__(self, contours)
+
+    def is_empty(self) -> bool:
+        """Whether the glyph has no contours, answered from a pending glyf record without drawing it."""
+        tt_glyph = getattr(self, '_tt_glyph', None)
+        if tt_glyph is None:
+            return not self.contours
+        if not hasattr(tt_glyph, 'data'):
+            return tt_glyph.numberOfContours == 0  # Empty, or already expanded
+        return struct.unpack('>h', tt_glyph.data[:2])[0] == 0
+
+    def pending_outline(self):
+        """Returns the compiled glyf record and left side bearing the contours will be drawn from, or None once drawn."""
+        tt_glyph = getattr(self, '_tt_glyph', None)
+        if tt_glyph is None or not hasattr(tt_glyph, 'data'):
+            return None
+        return bytes(tt_glyph.data), self._lsb
+
 
 def print_progress_bar(current: int, total: int, bar_length: int = 30):
     """Prints a live progress bar with stars on the same line."""
@@ -15,7 +75,11 @@ def print_progress_bar(current: int, total: int, bar_length: int = 30):
     sys.stdout.flush()
 
 
-def convert_ttfont_to_ufo(tt_font: TTFont) -> ufoLib2.Font:
+def convert_ttfont_to_ufo(tt_font: TTFont, glyph_unicodes: dict[str, list[int]] = None) -> ufoLib2.Font:
+    """
+    Converts a TrueType font to UFO. If `glyph_unicodes` is given, only the glyphs
+    it names are converted, with the unicodes it lists instead of those from the cmap.
+    """
     # Create a new UFO font
     ufo_font = ufoLib2.Font()
 
@@ -29,36 +93,44 @@ def convert_ttfont_to_ufo(tt_font: TTFont) -> ufoLib2.Font:
     ufo_font.info.ascender = tt_hhea_table.ascent
     ufo_font.info.descender = tt_hhea_table.descent
 
-    # Extract the cmap to get Unicode mappings
-    cmap = tt_font.getBestCmap()
-
     # Get the glyph set from the TTF font
     glyph_set = tt_font.getGlyphSet()
     tt_glyf_table = tt_font['glyf']
 
-    total_glyphs = len(glyph_set)
-    print(f"Converting {total_glyphs} glyphs to UFO format...")
+    if glyph_unicodes is None:
+        glyph_names = list(glyph_set.keys())
 
-    # Reverse the cmap to map glyph names to Unicode values
-    glyph_to_unicodes = {}
-    for unicode_val, glyph_name in cmap.items():
-        if glyph_name not in glyph_to_unicodes:
-            glyph_to_unicodes[glyph_name] = []
-        glyph_to_unicodes[glyph_name].append(unicode_val)
+        # Extract the cmap to get Unicode mappings
+        cmap = tt_font.getBestCmap()
 
-    # Iterate over glyphs and handle both simple and composite glyphs
-    for i, glyph_name in enumerate(glyph_set.keys(), start=1):
-        tt_glyph = tt_glyf_table[glyph_name]
+        # Reverse the cmap to map glyph names to Unicode values
+        glyph_to_unicodes = {}
+        for unicode_val, glyph_name in cmap.items():
+            if glyph_name not in glyph_to_unicodes:
+                glyph_to_unicodes[glyph_name] = []
+            glyph_to_unicodes[glyph_name].append(unicode_val)
+    else:
+        glyph_names = [glyph_name for glyph_name in glyph_set.keys() if glyph_name in glyph_unicodes]
+        glyph_to_unicodes = glyph_unicodes
 
-        glyph = ufo_font.newGlyph(glyph_name)
-
-        # Set glyph width and Unicode value, if available
-        glyph.width = glyph_set[glyph_name].width
-        glyph.unicodes = glyph_to_unicodes.get(glyph_name, [])
+    total_glyphs = len(glyph_names)
+    print(f"Converting {total_glyphs} glyphs to UFO format...")
 
-        # Check if the glyph is composite
-        if 'glyf' in tt_font and tt_glyph.isComposite():
-            for component in tt_glyph.components:
+    # Iterate over glyphs and handle both simple and composite glyphs
+    tt_hmtx_table = tt_font['hmtx']
+    for i, glyph_name in enumerate(glyph_names, start=1):
+        # Still compiled: composites are decompiled for their components, simple glyphs only when drawn
+        tt_glyph = tt_glyf_table.glyphs[glyph_name]
+        width, lsb = tt_hmtx_table[glyph_name]
+        unicodes = list(glyph_to_unicodes.get(glyph_name, []))
+
+        if not tt_glyph.isComposite():
+            ufo_font.addGlyph(LazyGlyph.from_tt_glyph(glyph_name, width, unicodes, tt_glyph, lsb))
+        else:
+            glyph = ufo_font.newGlyph(glyph_name)
+            glyph.width = width
+            glyph.unicodes = unicodes
+            for component in tt_glyf_table[glyph_name].components:
                 glyphName, transform = component.getComponentInfo()
 
                 c = Component(baseGlyph=glyphName, transformation=transform)
@@ -66,11 +138,6 @@ def convert_ttfont_to_ufo(tt_font: TTFont) -> ufoLib2.Font:
                 # Create a UFO component with reference to the base glyph
                 glyph.components.append(c)
 
-        else:
-            # Handle simple glyphs by drawing the outline
-            pen = glyph.getPen()
-            glyph_set[glyph_name].draw(pen)
-
         # Print progress every 10 glyphs or at the end
         if i % 100 == 0 or i == total_glyphs:
             print_progress_bar(i, total_glyphs)
@@ -78,3 +145,67 @@ def convert_ttfont_to_ufo(tt_font: TTFont) -> ufoLib2.Font:
     print()  # Ensure the next output starts on a new line
 
     return ufo_font
+
+
+def pack_glyph(glyph: Glyph) -> tuple:
+    """
+    Packs a UFO glyph into a plain tuple of (name, width, unicodes, contours, components, outline).
+    `outline` is the compiled glyf record and left side bearing of a glyph whose contours were
+    not drawn yet, in which case `contours` is empty.
+    """
+    outline = glyph.pending_outline() if isinstance(glyph, LazyGlyph) else None
+    if outline is not None:
+        return glyph.name, glyph.width, tuple(glyph.unicodes), (), (), outline
+    contours = tuple(
+        tuple((point.x, point.y, point.type, point.smooth) for point in contour)
+        for contour in glyph.contours
+    )
+    components = tuple(
+        (component.baseGlyph, tuple(component.transformation))
+        for component in glyph.components
+    )
+    return glyph.name, glyph.width, tuple(glyph.unicodes), contours, components, None
+
+
+def unpack_glyph(record: tuple) -> Glyph:
+    """Rebuilds a UFO glyph from the output of `pack_glyph`."""
+    name, width, unicodes, contours, components, outline = record
+    if outline is not None:
+        data, lsb = outline
+        return LazyGlyph.from_tt_glyph(name, width, list(unicodes), TTGlyph(data), lsb)
+    return Glyph(
+        name=name,
+        width=width,
+        unicodes=list(unicodes),
+        contours=[
+            Contour(points=[Point(x, y, type=segment_type, smooth=smooth) for x, y, segment_type, smooth in contour])
+            for contour in contours
+        ],
+        components=[
+            Component(baseGlyph=base_glyph, transformation=transformation)
+            for base_glyph, transformation in components
+        ],
+    )
+
+
+def pack_ufo_font(ufo_font: ufoLib2.Font) -> tuple:
+    """
+    Packs the parts of a converted UFO font that the merge uses into plain tuples,
+    which pickle far smaller and faster than ufoLib2 objects.
+
+    Returns:
+        A tuple of (info values, glyph records), with glyph records as made by `pack_glyph`.
+    """
+    info = tuple(getattr(ufo_font.info, name) for name in UFO_INFO_ATTRIBUTES)
+    return info, [pack_glyph(glyph) for glyph in ufo_font]
+
+
+def unpack_ufo_font(packed: tuple) -> ufoLib2.Font:
+    """Rebuilds a UFO font from the output of `pack_ufo_font`."""
+    info, glyphs = packed
+    ufo_font = ufoLib2.Font()
+    for name, value in zip(UFO_INFO_ATTRIBUTES, info):
+        setattr(ufo_font.info, name, value)
+    for record in glyphs:
+        ufo_font.addGlyph(unpack_glyph(record))
+    return ufo_font
@@ -1,23 +1,60 @@
 import argparse
-from importlib.metadata import version, PackageNotFoundError
+import glob
+import os
+from pathlib import Path
 
-from impl import merge_fonts, coverage_analysis
+# Only modules the parser itself needs are imported up front; each command imports what it runs,
+# so `coverage` and `--version` never load ufoLib2 and ufo2ft
+from impl.cache import CACHE_DIR_ENV, DEFAULT_CACHE_SIZE_MB, DEFAULT_MEMORY_CACHE_SIZE_MB, MemoryFontCache
+from impl.regions import OUTPUT_FORMATS
+from impl.profile import profiling
+from impl.serve import serve, default_socket_path
+from impl.profiles import BUILTIN_PROFILES, find_range_profile
+from impl.subset import subset_ranges_from_options
 
-# Get version dynamically from setuptools_scm
-try:
-    VERSION = version("font-mate")
-except PackageNotFoundError:
-    VERSION = "0.0.0"
 
+def package_version() -> str:
+    # Get version dynamically from setuptools_scm; importlib.metadata is slow to import, so only on request
+    from importlib.metadata import version, PackageNotFoundError
+    try:
+        return version("font-mate")
+    except PackageNotFoundError:
+        return "0.0.0"
 
-def main():
+
+class VersionAction(argparse.Action):
+    """Like argparse's 'version' action, but looks the version up only when asked for it."""
+
+    def __init__(self, option_strings, dest=argparse.SUPPRESS, default=argparse.SUPPRESS, help=None):
+        super().__init__(option_strings=option_strings, dest=dest, default=default, nargs=0, help=help)
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        print(f"font-mate {package_version()}")
+        parser.exit()
+
+
+def add_profile_arguments(parser):
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Print a table of the wall time, CPU time, peak RSS and glyph count of every stage to stderr when done."
+    )
+    parser.add_argument(
+        "--profile-trace",
+        type=str,
+        metavar="FILE",
+        help="Write the stage timings to FILE in the Chrome trace-event format, viewable in chrome://tracing or Perfetto."
+    )
+
+
+def run(argv=None, font_cache=None):
+    """Runs the command given by `argv` (the process arguments by default); `font_cache` is set when a server runs it."""
     parser = argparse.ArgumentParser(
         description="font-mate: A tool for font merging and coverage analysis."
     )
     parser.add_argument(
         '--version', '-v',
-        action='version',
-        version=f'font-mate {VERSION}',
+        action=VersionAction,
         help='Show the version number of the font-mate tool and exit.'
     )
 
@@ -32,9 +69,16 @@ def main():
         "fonts",
         metavar="FONT",
         type=str,
-        nargs="+",
+        nargs="*",
         help="List of font files to merge. The first file is the base font, and the rest are fallbacks."
     )
+    merge_parser.add_argument(
+        "--batch",
+        type=str,
+        metavar="MANIFEST",
+        help="Merge every target listed in a TOML or JSON manifest with the same fallback fonts, in place of FONT and --output. "
+             "Each fallback is read and filtered once for all targets; with -j, targets are merged in parallel."
+    )
     merge_parser.add_argument(
         "-o", "--output",
         type=str,
@@ -55,6 +99,110 @@ def main():
         action="store_true",
         help="Keep glyphs for rarely used codepoint ranges. By default, glyphs in these ranges are removed to reduce font size."
     )
+    merge_parser.add_argument(
+        "--range-profile",
+        type=str,
+        metavar="NAME",
+        help=f"Range filter profile deciding which codepoint ranges are dropped: one of the built-in profiles "
+             f"({', '.join(BUILTIN_PROFILES)}) or one defined in --range-profile-file. Defaults to 'default'."
+    )
+    merge_parser.add_argument(
+        "--range-profile-file",
+        type=str,
+        metavar="FILE",
+        help="TOML or JSON file defining range filter profiles, each with 'keep' and/or 'drop' lists of Unicode region names "
+             "and codepoint ranges. Its profile is used if it defines only one and --range-profile is not given."
+    )
+    merge_parser.add_argument(
+        "--unicodes",
+        type=str,
+        action="append",
+        metavar="CODEPOINTS",
+        help="Only keep glyphs for these codepoints, and their components, from every input. Codepoints are hexadecimal, "
+             "optionally prefixed with U+ or 0x, and ranges are written U+0041-005A; separate them with commas or spaces. May be repeated."
+    )
+    merge_parser.add_argument(
+        "--unicodes-file",
+        type=str,
+        action="append",
+        metavar="FILE",
+        help="Like --unicodes, with the codepoints read from FILE; '#' starts a comment. May be repeated."
+    )
+    merge_parser.add_argument(
+        "--text-file",
+        type=str,
+        action="append",
+        metavar="FILE",
+        help="Like --unicodes, keeping the codepoints of every character in the UTF-8 text FILE. May be repeated. "
+             "The codepoints of all three options are combined, and replace the default range and non-BMP filters."
+    )
+    merge_parser.add_argument(
+        "--direct",
+        action="store_true",
+        help="Merge at the TrueType table level, copying compiled glyph records instead of converting through UFO. Cannot be combined with --ufo-dir."
+    )
+    merge_parser.add_argument(
+        "--plan",
+        action="store_true",
+        help="Decide which glyphs survive the merge from cmaps and component references first, and convert only those to UFO. "
+             "The output is the same; fallbacks that contribute few glyphs are much cheaper. The fallback cache is not used."
+    )
+    merge_parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Keep a build manifest next to the output and, on reruns, reuse the glyphs of inputs that did not change since the previous build. "
+             "Implies --direct."
+    )
+    merge_parser.add_argument(
+        "--low-memory",
+        action="store_true",
+        help="Index the inputs instead of reading their outlines, and copy only the glyph records that survive the merge "
+             "from memory-mapped inputs while writing. Peak memory follows the output size rather than the inputs. Implies --direct."
+    )
+    merge_parser.add_argument(
+        "--fast-compile",
+        action="store_true",
+        help="Compile the merged UFO font straight to TrueType tables, skipping the cubic-to-quadratic, filter and feature stages of ufo2ft, "
+             "which glyphs converted from TrueType fonts do not need. The output is the same. Cannot be combined with --direct."
+    )
+    merge_parser.add_argument(
+        "-j", "--jobs",
+        type=int,
+        default=1,
+        help="Number of worker processes used to read and filter the input fonts concurrently, and with --fast-compile to compile "
+             "the merged glyphs. Use 0 for one per CPU. Defaults to 1."
+    )
+    merge_parser.add_argument(
+        "--cache-dir",
+        type=str,
+        default=os.environ.get(CACHE_DIR_ENV),
+        help=f"Directory for caching decoded and filtered fallback fonts between runs, keyed by file content and filter options. "
+             f"Defaults to ${CACHE_DIR_ENV}; no caching if unset."
+    )
+    merge_parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=DEFAULT_CACHE_SIZE_MB,
+        help=f"Maximum size of the fallback cache in megabytes; least recently used entries are evicted beyond it. Defaults to {DEFAULT_CACHE_SIZE_MB}."
+    )
+    merge_parser.add_argument(
+        "--remove-empty-glyphs",
+        action="store_true",
+        help="Remove glyphs without contours or components, and their codepoints, from the merged font. "
+             ".notdef, space and format characters, and empty glyphs used as components are kept."
+    )
+    merge_parser.add_argument(
+        "--remove-dangling-glyphs",
+        action="store_true",
+        help="Remove glyphs that no codepoint or .notdef reaches, directly or through components, from the merged font."
+    )
+    merge_parser.add_argument(
+        "--dedupe-outlines",
+        action="store_true",
+        help="Store outlines that repeat in the merged font, with the same advance width, only once: later copies become "
+             "a component of the first. Cannot be combined with --direct."
+    )
+    add_profile_arguments(merge_parser)
 
     # Coverage subcommand
     coverage_parser = subparsers.add_parser(
@@ -62,28 +210,153 @@ def main():
         help="Analyze the coverage of a font, detailing which Unicode regions are supported."
     )
     coverage_parser.add_argument(
-        "font",
+        "fonts",
+        metavar="FONT",
         type=str,
-        help="Path to the font file to analyze for Unicode coverage."
+        nargs="+",
+        help="Font files, directories or glob patterns to analyze for Unicode coverage. "
+             "With more than one font, a single matrix of fonts by Unicode region is written."
     )
     coverage_parser.add_argument(
       "-o", "--output",
       type=str,
       help="Path to save the coverage report. If not specified, the output will be printed to stdout."
     )
+    coverage_parser.add_argument(
+        "--fast",
+        action="store_true",
+        help="Load tables lazily and classify glyphs from loca offsets and raw glyph headers instead of decompiling outlines."
+    )
+    coverage_parser.add_argument(
+        "-j", "--jobs",
+        type=int,
+        default=1,
+        help="Number of worker processes used when analyzing several fonts. Use 0 for one per CPU. Defaults to 1."
+    )
+    coverage_parser.add_argument(
+        "--format",
+        choices=OUTPUT_FORMATS,
+        default="text",
+        help="Report format. 'json', 'ndjson' and 'csv' carry every region count, the glyph statistics and the dangling glyphs, "
+             "and are written font by font as each one finishes. Defaults to 'text'."
+    )
+    add_profile_arguments(coverage_parser)
 
-    args = parser.parse_args()
+    # Serve subcommand
+    serve_parser = subparsers.add_parser(
+        "serve",
+        help="Run as a server that answers merge and coverage requests on a Unix socket, keeping input fonts cached in memory between requests."
+    )
+    serve_parser.add_argument(
+        "--socket",
+        type=str,
+        default=default_socket_path(),
+        help=f"Path of the Unix socket to listen on. Defaults to {default_socket_path()}."
+    )
+    serve_parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=DEFAULT_MEMORY_CACHE_SIZE_MB,
+        help=f"Maximum size of the in-memory font cache in megabytes; least recently used fonts are dropped beyond it. "
+             f"Defaults to {DEFAULT_MEMORY_CACHE_SIZE_MB}."
+    )
+
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        if font_cache is not None:
+            parser.error("serve cannot be requested from a running server")
+        serve(args.socket, run, MemoryFontCache(args.cache_size << 20))
+        return
 
+    if args.command == "merge" and (args.direct or args.incremental or args.low_memory) and args.ufo_dir:
+        merge_parser.error("--direct, --incremental and --low-memory do not produce a UFO font; --ufo-dir cannot be used with them")
+    if args.command == "merge" and (args.direct or args.incremental or args.low_memory) and args.fast_compile:
+        merge_parser.error("--direct, --incremental and --low-memory do not compile a UFO font; --fast-compile cannot be used with them")
+    if args.command == "merge" and (args.direct or args.incremental or args.low_memory) and args.dedupe_outlines:
+        merge_parser.error("--direct, --incremental and --low-memory copy compiled glyph records; --dedupe-outlines cannot be used with them")
+
+    subset_ranges = None
+    removed_ranges = None
     if args.command == "merge":
-        merge_fonts(
-            font_paths=args.fonts,
-            output=args.output,
-            ufo_dir=args.ufo_dir,
-            keep_non_bmp=args.keep_non_bmp,
-            keep_all_ranges=args.keep_all_ranges
-        )
-    elif args.command == "coverage":
-        coverage_analysis(args.font, output_file=args.output)
+        if args.batch is None and not args.fonts:
+            merge_parser.error("the following arguments are required: FONT (or --batch)")
+        if args.batch is not None and (args.fonts or args.output or args.ufo_dir):
+            merge_parser.error("--batch takes the fonts and outputs from its manifest; FONT, --output and --ufo-dir cannot be used with it")
+        if args.batch is not None and (args.plan or args.incremental):
+            merge_parser.error("--plan and --incremental depend on each target's base font; they cannot be used with --batch")
+        if args.incremental and (args.remove_empty_glyphs or args.remove_dangling_glyphs):
+            merge_parser.error("--remove-empty-glyphs and --remove-dangling-glyphs cannot be used with --incremental")
+        range_profile_given = args.range_profile is not None or args.range_profile_file is not None
+        try:
+            subset_ranges = subset_ranges_from_options(args.unicodes, args.unicodes_file, args.text_file)
+            if range_profile_given:
+                removed_ranges = find_range_profile(args.range_profile, args.range_profile_file).removed_ranges()
+        except (ValueError, OSError) as e:
+            merge_parser.error(str(e))
+        if subset_ranges is not None and (args.keep_non_bmp or args.keep_all_ranges or range_profile_given):
+            merge_parser.error("--unicodes, --unicodes-file and --text-file select the codepoints to keep; "
+                               "--keep-non-bmp, --keep-all-ranges and range profiles cannot be used with them")
+        if args.keep_all_ranges and range_profile_given:
+            merge_parser.error("--keep-all-ranges is the 'none' range profile; it cannot be combined with another one")
+
+    with profiling(args.command, summary=args.profile, trace_path=args.profile_trace):
+        if args.command == "merge" and args.batch is not None:
+            from impl.batch import merge_batch, read_batch_manifest
+            try:
+                fallbacks, targets = read_batch_manifest(args.batch)
+            except (ValueError, OSError) as e:
+                merge_parser.error(str(e))
+            merge_batch(
+                targets,
+                fallbacks,
+                jobs=args.jobs,
+                font_cache=font_cache,
+                keep_non_bmp=args.keep_non_bmp,
+                keep_all_ranges=args.keep_all_ranges,
+                direct=args.direct,
+                low_memory=args.low_memory,
+                fast_compile=args.fast_compile,
+                subset_ranges=subset_ranges,
+                removed_ranges=removed_ranges,
+                remove_empty_glyphs=args.remove_empty_glyphs,
+                remove_dangling_glyphs=args.remove_dangling_glyphs,
+                dedupe_outlines=args.dedupe_outlines
+            )
+        elif args.command == "merge":
+            from impl import merge_fonts
+            merge_fonts(
+                font_paths=args.fonts,
+                output=args.output,
+                ufo_dir=args.ufo_dir,
+                keep_non_bmp=args.keep_non_bmp,
+                keep_all_ranges=args.keep_all_ranges,
+                direct=args.direct,
+                jobs=args.jobs,
+                cache_dir=args.cache_dir,
+                cache_size=args.cache_size,
+                incremental=args.incremental,
+                plan=args.plan,
+                low_memory=args.low_memory,
+                fast_compile=args.fast_compile,
+                font_cache=font_cache,
+                subset_ranges=subset_ranges,
+                removed_ranges=removed_ranges,
+                remove_empty_glyphs=args.remove_empty_glyphs,
+                remove_dangling_glyphs=args.remove_dangling_glyphs,
+                dedupe_outlines=args.dedupe_outlines
+            )
+        elif args.command == "coverage":
+            from impl import coverage_analysis, coverage_batch
+            single_font = len(args.fonts) == 1 and not Path(args.fonts[0]).is_dir() and not glob.has_magic(args.fonts[0])
+            if single_font and args.format == "text":
+                coverage_analysis(args.fonts[0], output_file=args.output, fast=args.fast, cache=font_cache)
+            else:
+                coverage_batch(args.fonts, output_file=args.output, fast=args.fast, jobs=args.jobs, output_format=args.format, cache=font_cache)
+
+
+def main():
+    run()
 
 
 if __name__ == "__main__":